@@ -34,6 +34,61 @@ def editable(session: nox.Session) -> None:
     session.run("hugo", "version")
 
 
+# Default budget in microseconds for `nox -s importtime`, covering the hugo
+# package and everything it imports when running `python -m hugo`.
+IMPORT_TIME_BUDGET_US = 20_000
+
+
+@nox.session(default=False, reuse_venv=True)
+def importtime(session: nox.Session) -> None:
+    """Check that launching Hugo through Python stays cheap.
+
+    Fails if importing hugo.cli pulls in modules that only the editable-install
+    path or the Python API needs, or if the hugo imports in
+    `python -X importtime -m hugo version` exceed the budget. Pass a different
+    budget in microseconds with -- <budget>.
+    """
+    budget = int(session.posargs[0]) if session.posargs else IMPORT_TIME_BUDGET_US
+    session.install(".")
+
+    session.run(
+        "python",
+        "-c",
+        "import sys, hugo.cli; "
+        "eager = {'json', 'pathlib', 'contextlib', 'typing', 'subprocess', 'hugo.stats'} & set(sys.modules); "
+        "sys.exit(f'hugo.cli imported {sorted(eager)} eagerly' if eager else 0)",
+    )
+
+    # Warm up the bytecode cache first so that compiling hugo's modules is not
+    # counted against the budget.
+    session.run("python", "-m", "hugo", "version", silent=True)
+    output = session.run(
+        "python",
+        "-X",
+        "importtime",
+        "-m",
+        "hugo",
+        "version",
+        env={"PYHUGO_NO_BANNER": "1"},
+        silent=True,
+    )
+
+    # Top-level entries (without indentation) are imports made by runpy and by
+    # hugo/__main__.py. Their cumulative times include everything they import.
+    total = 0
+    for line in output.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (hugo\S*)$", line)
+        if match:
+            session.log(f"{match.group(2)}: {match.group(1)} us")
+            total += int(match.group(1))
+
+    session.log(
+        f"Total import time of the hugo package: {total} us (budget {budget} us)"
+    )
+    if total > budget:
+        session.error(f"Importing hugo took {total} us, over the {budget} us budget")
+
+
 @nox.session(default=False, reuse_venv=True)
 def docs(session: nox.Session) -> None:
     """Build the documentation website.
@@ -48,6 +103,84 @@ def docs(session: nox.Session) -> None:
         session.run("hugo", "--minify", "--source", str(DOCS_DIR))
 
 
+@nox.session(default=False, reuse_venv=True)
+def targets(session: nox.Session) -> None:
+    """Build wheels for several targets concurrently with shared Go caches.
+
+    Arguments are passed to scripts/build_targets.py, for example:
+    nox -s targets -- --targets linux/amd64,linux/arm64,windows/amd64 --jobs 4
+    """
+    session.install("build")
+    session.run("python", "scripts/build_targets.py", *session.posargs)
+
+
+@nox.session(default=False, reuse_venv=True)
+def render(session: nox.Session) -> None:
+    """Measure Hugo's render throughput and memory use on synthetic sites.
+
+    Arguments are passed to scripts/benchmark_render.py, for example:
+    nox -s render -- --pages 10000,100000,500000 --runs 5 --json render.json
+    """
+    session.install(".")
+    session.run("python", "scripts/benchmark_render.py", *session.posargs)
+
+
+@nox.session(default=False, reuse_venv=True)
+def regression(session: nox.Session) -> None:
+    """Compare the performance of the Hugo binaries in two wheels.
+
+    Arguments are passed to scripts/compare_wheels.py, for example:
+    nox -s regression -- old.whl dist/new.whl --report regression.md
+    """
+    if len(session.posargs) < 2:
+        session.error(
+            "Usage: nox -s regression -- BASELINE.whl CANDIDATE.whl [options]"
+        )
+    session.run("python", "scripts/compare_wheels.py", *session.posargs)
+
+
+@nox.session(name="wheel-compression", default=False, reuse_venv=True)
+def wheel_compression(session: nox.Session) -> None:
+    """Compare wheel size and install time for binary_compression settings.
+
+    Arguments are passed to scripts/benchmark_wheel_compression.py, for
+    example: nox -s wheel-compression -- dist/hugo-*.whl --runs 10
+    """
+    if not session.posargs:
+        session.error("Usage: nox -s wheel-compression -- WHEEL [options]")
+    session.install("uv")
+    session.run("python", "scripts/benchmark_wheel_compression.py", *session.posargs)
+
+
+def _go_version() -> str:
+    """Return the Go version that wheels are built with."""
+    content = (DIR / "scripts" / "piwheels_go_toolchain.py").read_text()
+    return re.search(r'^GO_VERSION = "([0-9.]+)"', content, re.MULTILINE).group(1)
+
+
+@nox.session(default=False, reuse_venv=True)
+def variants(session: nox.Session) -> None:
+    """Compare binary size and start-up latency of Hugo build variants.
+
+    Arguments are passed to scripts/benchmark_variants.py, for example:
+    nox -s variants -- --variants baseline,no-withdeploy,goamd64-v3 --runs 20
+    """
+    session.install(f"go-bin=={_go_version()}")
+    session.run("python", "scripts/benchmark_variants.py", *session.posargs)
+
+
+@nox.session(default=False, reuse_venv=True)
+def pgo(session: nox.Session) -> None:
+    """Collect a CPU profile for a profile-guided build of Hugo.
+
+    Arguments are passed to scripts/collect_pgo_profile.py. Build with the
+    profile afterwards using -Csetup-args=-Dpgo=build/pgo/hugo.pgo.
+    """
+    session.install(f"go-bin=={_go_version()}")
+    session.install(".")
+    session.run("python", "scripts/collect_pgo_profile.py", *session.posargs)
+
+
 def _get_version(session: nox.Session) -> str:
     """Extract version from session posargs or meson.build."""
     if session.posargs:
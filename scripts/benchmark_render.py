@@ -0,0 +1,295 @@
+"""
+Measures Hugo's render throughput on synthetic sites of several sizes.
+
+For every size, a site is generated with generate_site.py and built --runs
+times from a cold resource cache. Each build records its wall time, pages
+per second and peak resident set size, as reported by wait4() for the Hugo
+process. These builds skip the image resizing, which would otherwise
+dominate the throughput. If the site has images, it is built --runs more
+times with them, and the difference in median build time is reported as
+image processing. A final build with --templateMetrics records the most
+expensive templates. Peak RSS comes from os.wait4(), so this runs on Linux
+and macOS.
+
+Usage:
+    python scripts/benchmark_render.py [--pages 10000,100000] [--runs N] [--hugo PATH]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from generate_site import SKIP_IMAGES_ENV_VAR, generate_site
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Hugo prints a table of what it built, with a row per kind of output.
+PAGES_PATTERN = re.compile(r"^\s*Pages\s*│\s*(\d+)", re.MULTILINE)
+
+# A row of the --templateMetrics table: cumulative, average and maximum
+# duration, count and template name.
+TEMPLATE_METRICS_PATTERN = re.compile(
+    r"^\s*(\S+)\s+(\S+)\s+(\S+)\s+(\d+)\s+(\S+)\s*$", re.MULTILINE
+)
+
+GO_DURATION_UNITS = {
+    "ns": 1e-9,
+    "us": 1e-6,
+    "µs": 1e-6,
+    "ms": 1e-3,
+    "s": 1.0,
+    "m": 60.0,
+    "h": 3600.0,
+}
+
+
+@dataclass
+class Run:
+    seconds: float
+    max_rss: int
+    pages: int
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds
+
+
+@dataclass
+class SiteResult:
+    pages: int
+    images: int
+    runs: list[Run] = field(default_factory=list)
+    image_runs: list[Run] = field(default_factory=list)
+    templates: list[dict[str, object]] = field(default_factory=list)
+
+    def median(self, attribute: str) -> float:
+        return statistics.median(getattr(run, attribute) for run in self.runs)
+
+    def image_seconds(self) -> float | None:
+        """Return the median time that resizing the images adds to a build."""
+        if not self.image_runs:
+            return None
+        with_images = statistics.median(run.seconds for run in self.image_runs)
+        return max(0.0, with_images - self.median("seconds"))
+
+
+def parse_pages(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument(
+        "--pages",
+        type=parse_pages,
+        default=[10000, 50000],
+        help="sizes of the sites to build (default: 10000,50000)",
+    )
+    p.add_argument(
+        "--images",
+        type=float,
+        default=0.01,
+        help="share of pages that have an image to process (default: 0.01)",
+    )
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument(
+        "--hugo",
+        type=Path,
+        help="Hugo binary to benchmark (default: the installed hugo package's)",
+    )
+    p.add_argument("--workdir", type=Path, default=ROOT / "build" / "render")
+    p.add_argument("--json", type=Path, help="also write the results to this file")
+    p.add_argument("--no-template-metrics", action="store_true")
+    return p.parse_args()
+
+
+def go_duration(value: str) -> float:
+    """Return the seconds in a Go duration string such as 1m2.5s or 350µs."""
+    return sum(
+        float(number) * GO_DURATION_UNITS[unit]
+        for number, unit in re.findall(r"([\d.]+)(ns|us|µs|ms|s|m|h)", value)
+    )
+
+
+def run_hugo(
+    command: list[str], env: dict[str, str] | None = None
+) -> tuple[str, float, int]:
+    """Run Hugo and return its stdout, wall time and peak RSS in bytes.
+
+    `env` holds variables to set on top of the current environment.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        env={**os.environ, **env} if env else None,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+    )
+    stdout = process.stdout.read()
+    # wait4() reports the resource usage of this child alone, unlike
+    # getrusage(RUSAGE_CHILDREN), which covers every child waited for so far.
+    _, status, rusage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    process.stdout.close()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stdout)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+    return stdout, seconds, max_rss
+
+
+def build_site(
+    hugo: Path, site: Path, *args: str, env: dict[str, str] | None = None
+) -> tuple[str, float, int]:
+    """Build `site` from a cold resource cache into a throwaway directory."""
+    shutil.rmtree(site / "resources", ignore_errors=True)
+    with tempfile.TemporaryDirectory(prefix="hugo-render-") as destination:
+        return run_hugo(
+            [
+                str(hugo),
+                "build",
+                "--source",
+                str(site),
+                "--destination",
+                destination,
+                "--cacheDir",
+                str(Path(destination, ".cache")),
+                *args,
+            ],
+            env,
+        )
+
+
+def parse_template_metrics(output: str, limit: int = 10) -> list[dict[str, object]]:
+    metrics = [
+        {
+            "template": match[5],
+            "count": int(match[4]),
+            "cumulative": go_duration(match[1]),
+            "average": go_duration(match[2]),
+            "maximum": go_duration(match[3]),
+        }
+        for match in TEMPLATE_METRICS_PATTERN.finditer(output)
+        if match[4].isdigit() and go_duration(match[1])
+    ]
+    return sorted(metrics, key=lambda m: m["cumulative"], reverse=True)[:limit]
+
+
+def benchmark_site(hugo: Path, pages: int, args: argparse.Namespace) -> SiteResult:
+    images = int(pages * args.images)
+    site = args.workdir / f"site-{pages}"
+    start = time.perf_counter()
+    generate_site(site, pages=pages, images=images)
+    print(f"Generated {pages} pages in {time.perf_counter() - start:.1f}s", flush=True)
+
+    result = SiteResult(pages=pages, images=images)
+    skip_images = {SKIP_IMAGES_ENV_VAR: "true"}
+    for i in range(args.runs):
+        output, seconds, max_rss = build_site(hugo, site, env=skip_images)
+        match = PAGES_PATTERN.search(output)
+        run = Run(seconds, max_rss, int(match[1]) if match else pages)
+        print(
+            f"  run {i + 1}/{args.runs}: {seconds:.2f}s, "
+            f"{run.pages_per_second:.0f} pages/s, {max_rss / 2**20:.0f} MB",
+            flush=True,
+        )
+        result.runs.append(run)
+    for i in range(args.runs if images else 0):
+        _, seconds, max_rss = build_site(hugo, site)
+        result.image_runs.append(Run(seconds, max_rss, result.runs[0].pages))
+        print(
+            f"  run {i + 1}/{args.runs} with {images} images: {seconds:.2f}s, "
+            f"{max_rss / 2**20:.0f} MB",
+            flush=True,
+        )
+
+    if not args.no_template_metrics:
+        output, _, _ = build_site(hugo, site, "--templateMetrics", env=skip_images)
+        result.templates = parse_template_metrics(output)
+    return result
+
+
+def report(results: list[SiteResult]) -> None:
+    print(
+        "\n| pages | rendered pages | time (s) | pages/s | peak RSS (MB) "
+        "| images | image processing (s) | images/s |"
+    )
+    print("| ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: |")
+    for result in results:
+        image_seconds = result.image_seconds()
+        if image_seconds is None:
+            images = "- | -"
+        else:
+            rate = f"{result.images / image_seconds:.0f}" if image_seconds else "-"
+            images = f"{image_seconds:.2f} | {rate}"
+        print(
+            f"| {result.pages} | {result.runs[0].pages} "
+            f"| {result.median('seconds'):.2f} "
+            f"| {result.median('pages_per_second'):.0f} "
+            f"| {result.median('max_rss') / 2**20:.0f} "
+            f"| {result.images} | {images} |"
+        )
+    for result in results:
+        if not result.templates:
+            continue
+        print(f"\nSlowest templates for {result.pages} pages:")
+        for metric in result.templates[:5]:
+            print(
+                f"  {metric['template']:<40} {metric['cumulative']:>8.2f}s "
+                f"cumulative over {metric['count']} executions"
+            )
+    print(
+        "\nTimes, throughput and memory are medians over the measured runs, "
+        "which leave the images unprocessed. Image processing is the median "
+        "time that building with them adds."
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    if args.hugo is None:
+        from hugo.api import executable
+
+        args.hugo = executable()
+    args.workdir = args.workdir.resolve()
+    args.workdir.mkdir(parents=True, exist_ok=True)
+
+    version = subprocess.check_output([str(args.hugo), "version"], text=True).strip()
+    print(version)
+    results = [benchmark_site(args.hugo, pages, args) for pages in args.pages]
+    report(results)
+    if args.json:
+        data = {
+            "hugo": version,
+            "sites": [
+                {
+                    **asdict(result),
+                    "median_seconds": result.median("seconds"),
+                    "median_pages_per_second": result.median("pages_per_second"),
+                    "median_max_rss": result.median("max_rss"),
+                    "median_image_seconds": result.image_seconds(),
+                }
+                for result in results
+            ],
+        }
+        args.json.write_text(json.dumps(data, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Builds the Hugo binary in several variants (build tags, -trimpath, CGO
+optimisation flags, GOAMD64 levels, PGO) and compares their binary size,
+deflated size and start-up latency, so that the flags build_hugo.py uses
+are chosen from measurements.
+
+Every variant is built by build_hugo.py into its own cache directory, with
+the Go build and module caches shared between them. Latency is measured for
+`hugo version` and for a full build of the documentation site, over --runs
+runs after one warm-up run.
+
+Usage:
+    python scripts/benchmark_variants.py [--variants baseline,no-withdeploy] [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from build_hugo import HOST_GOARCH, HOST_GOOS
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS = ROOT / "scripts"
+
+
+@dataclass
+class Variant:
+    name: str
+    description: str
+    args: tuple[str, ...] = ()
+    env: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class VariantResult:
+    name: str
+    description: str
+    build_time: float
+    binary_size: int
+    deflated_size: int
+    version_times: list[float]
+    docs_times: list[float]
+
+
+def available_variants(pgo_profile: Path | None = None) -> list[Variant]:
+    """Return the variants that can be built and run on this host."""
+    variants = [
+        Variant("baseline", "flags the wheels ship with"),
+        Variant("no-withdeploy", "-tags extended", ("--tags", "extended")),
+        Variant("no-trimpath", "without -trimpath", ("--no-trimpath",)),
+        Variant("cgo-O2", "CGO_CFLAGS=-g0 -O2", ("--cgo-cflags", "-g0 -O2")),
+        Variant("cgo-O3", "CGO_CFLAGS=-g0 -O3", ("--cgo-cflags", "-g0 -O3")),
+        Variant("cgo-Os", "CGO_CFLAGS=-g0 -Os", ("--cgo-cflags", "-g0 -Os")),
+    ]
+    # Binaries built for a higher microarchitecture level than the host
+    # supports refuse to start. v4 is left out, since few CPUs have it, and
+    # main() skips a v2 or v3 binary that does not start on this host.
+    if HOST_GOARCH == "amd64":
+        variants += [
+            Variant(f"goamd64-{level}", f"GOAMD64={level}", ("--arch-level", level))
+            for level in ("v2", "v3")
+        ]
+    if pgo_profile is not None:
+        variants.append(
+            Variant(
+                "pgo",
+                f"-pgo={pgo_profile.name}",
+                ("--pgo", str(pgo_profile.resolve())),
+            )
+        )
+    return variants
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument(
+        "--variants",
+        default="",
+        help="comma-separated variant names (default: all available)",
+    )
+    p.add_argument("--runs", type=int, default=10)
+    p.add_argument(
+        "--pgo-profile",
+        type=Path,
+        help="CPU profile to build an additional 'pgo' variant with",
+    )
+    p.add_argument("--site", type=Path, default=ROOT / "docs")
+    p.add_argument("--workdir", type=Path, default=ROOT / "build" / "variants")
+    p.add_argument("--json", type=Path, help="also write the results to this file")
+    p.add_argument("--list", action="store_true", help="list the variants and exit")
+    return p.parse_args()
+
+
+def project_version() -> str:
+    content = (ROOT / "meson.build").read_text()
+    match = re.search(r"version\s*:\s*'([0-9.]+)'", content)
+    return match.group(1) if match else "0"
+
+
+def build_variant(
+    variant: Variant, workdir: Path, env: dict[str, str]
+) -> tuple[Path, float]:
+    """Build one variant and return the binary and the build's wall time."""
+    exe_ext = ".exe" if HOST_GOOS == "windows" else ""
+    variant_dir = workdir / variant.name
+    output = variant_dir / f"hugo{exe_ext}"
+    log = workdir / "logs" / f"{variant.name}.log"
+    command = [
+        sys.executable,
+        str(SCRIPTS / "build_hugo.py"),
+        "--hugo-src",
+        str(ROOT / "hugo-src"),
+        "--cache",
+        str(variant_dir / "cache"),
+        "--version",
+        project_version(),
+        "--output",
+        str(output),
+        *variant.args,
+    ]
+    start = time.perf_counter()
+    with log.open("w") as file:
+        returncode = subprocess.call(
+            command,
+            cwd=ROOT,
+            env={**env, **variant.env},
+            stdout=file,
+            stderr=subprocess.STDOUT,
+        )
+    if returncode != 0:
+        msg = f"building variant {variant.name} failed, see {log}"
+        raise RuntimeError(msg)
+    return output, time.perf_counter() - start
+
+
+def deflated_size(path: Path) -> int:
+    """Return the size of `path` compressed the way wheels compress it."""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    size = 0
+    with path.open("rb") as file:
+        while chunk := file.read(1 << 20):
+            size += len(compressor.compress(chunk))
+    return size + len(compressor.flush())
+
+
+def runs_on_host(binary: Path) -> bool:
+    """Return whether `binary` starts on this host's CPU."""
+    try:
+        process = subprocess.run(
+            [str(binary), "version"],
+            check=False,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return False
+    return process.returncode == 0
+
+
+def time_command(command: list[str], runs: int) -> list[float]:
+    """Run `command` once to warm up, then `runs` times, and return the timings."""
+    timings = []
+    for i in range(runs + 1):
+        start = time.perf_counter()
+        subprocess.run(
+            command,
+            check=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if i:
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def measure(
+    variant: Variant, binary: Path, build_time: float, args: argparse.Namespace
+) -> VariantResult:
+    with tempfile.TemporaryDirectory(prefix=f"hugo-{variant.name}-") as destination:
+        docs_times = time_command(
+            [
+                str(binary),
+                "--source",
+                str(args.site),
+                "--destination",
+                destination,
+                "--quiet",
+            ],
+            args.runs,
+        )
+    return VariantResult(
+        name=variant.name,
+        description=variant.description,
+        build_time=build_time,
+        binary_size=binary.stat().st_size,
+        deflated_size=deflated_size(binary),
+        version_times=time_command([str(binary), "version"], args.runs),
+        docs_times=docs_times,
+    )
+
+
+def _ms(timings: list[float]) -> str:
+    return f"{statistics.median(timings) * 1000:.1f} ± {statistics.pstdev(timings) * 1000:.1f}"
+
+
+def report(results: list[VariantResult]) -> None:
+    """Print a Markdown table, with sizes and latencies relative to the first variant."""
+    base = results[0]
+    print(
+        "\n| variant | flags | binary (MB) | deflated (MB) | `hugo version` (ms) "
+        "| docs build (ms) |"
+    )
+    print("| --- | --- | ---: | ---: | ---: | ---: |")
+    for result in results:
+        size_delta = (result.binary_size / base.binary_size - 1) * 100
+        version_delta = (
+            statistics.median(result.version_times)
+            / statistics.median(base.version_times)
+            - 1
+        ) * 100
+        docs_delta = (
+            statistics.median(result.docs_times) / statistics.median(base.docs_times)
+            - 1
+        ) * 100
+        print(
+            f"| {result.name} | {result.description} "
+            f"| {result.binary_size / 2**20:.1f} ({size_delta:+.1f}%) "
+            f"| {result.deflated_size / 2**20:.1f} "
+            f"| {_ms(result.version_times)} ({version_delta:+.1f}%) "
+            f"| {_ms(result.docs_times)} ({docs_delta:+.1f}%) |"
+        )
+    print("\nLatencies are the median ± standard deviation over the measured runs.")
+
+
+def main() -> int:
+    args = parse_args()
+    variants = available_variants(args.pgo_profile)
+    if args.list:
+        for variant in variants:
+            print(f"{variant.name:<16} {variant.description}")
+        return 0
+    if args.variants:
+        by_name = {variant.name: variant for variant in variants}
+        unknown = [name for name in args.variants.split(",") if name not in by_name]
+        if unknown:
+            print(
+                f"unknown or unavailable variants: {', '.join(unknown)}",
+                file=sys.stderr,
+            )
+            return 2
+        variants = [by_name[name] for name in args.variants.split(",")]
+
+    args.workdir = args.workdir.resolve()
+    args.site = args.site.resolve()
+    (args.workdir / "logs").mkdir(parents=True, exist_ok=True)
+
+    # Variants only differ in flags, so they share the caches: dependencies
+    # are downloaded once and packages whose flags do not change are compiled
+    # once.
+    env = dict(os.environ)
+    env.setdefault("PYHUGO_GOCACHE", str(args.workdir / "go-build"))
+    env.setdefault("PYHUGO_GOMODCACHE", str(args.workdir / "go-mod"))
+
+    # Variants are built and measured one at a time, so that neither the
+    # Go builds nor the other measurements skew the timings.
+    results = []
+    for variant in variants:
+        print(f"{variant.name}: building", flush=True)
+        binary, build_time = build_variant(variant, args.workdir, env)
+        if not runs_on_host(binary):
+            print(f"{variant.name}: skipped, the binary does not run on this CPU")
+            continue
+        print(f"{variant.name}: built in {build_time:.1f}s, measuring", flush=True)
+        results.append(measure(variant, binary, build_time, args))
+
+    if not results:
+        print("none of the variants run on this CPU", file=sys.stderr)
+        return 1
+    report(results)
+    if args.json:
+        args.json.write_text(
+            json.dumps([asdict(result) for result in results], indent=2)
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
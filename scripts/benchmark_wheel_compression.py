@@ -0,0 +1,213 @@
+"""
+Compares how the compression of the Hugo binary in a wheel trades wheel size
+against install time, to choose the binary_compression option.
+
+The wheel is repacked once per compression setting, with every other member
+left as it is. For each repacked wheel the script reports the wheel size,
+which is what a mirror serves and a client downloads, the time to write it,
+the time to unzip it, and the wall time of `pip install` and, if it is on
+PATH, `uv pip install` into an empty target directory. Installers run
+without their caches, so that every run unzips the wheel again.
+
+Usage:
+    python scripts/benchmark_wheel_compression.py WHEEL [--compressions stored,deflate-1,deflate] [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from build_plan import zip_compression
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Matches the binaries of current wheels as well as the
+# hugo-<version>-<os>-<arch> binaries of wheels from before the Meson build.
+BINARY_MEMBER_PATTERN = re.compile(r"(^|/)hugo/binaries/hugo[^/]*$")
+
+
+@dataclass
+class CompressionResult:
+    compression: str
+    wheel_size: int
+    repack_seconds: float
+    unzip_seconds: list[float] = field(default_factory=list)
+    install_seconds: dict[str, list[float]] = field(default_factory=dict)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("wheel", type=Path, help="wheel to repack, such as one from dist/")
+    p.add_argument(
+        "--compressions",
+        type=lambda value: [item for item in value.split(",") if item],
+        default=["stored", "deflate-1", "deflate-3", "deflate", "deflate-9"],
+        help="binary_compression values to compare "
+        "(default: stored,deflate-1,deflate-3,deflate,deflate-9)",
+    )
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument(
+        "--installers",
+        type=lambda value: [item for item in value.split(",") if item],
+        default=["pip", "uv"],
+        help="installers to time, those not found are skipped (default: pip,uv)",
+    )
+    p.add_argument("--workdir", type=Path, default=ROOT / "build" / "wheel-compression")
+    p.add_argument("--json", type=Path, help="also write the results to this file")
+    return p.parse_args()
+
+
+def repack(wheel: Path, compression: str, dest: Path) -> tuple[Path, float]:
+    """Rewrite `wheel` into `dest` with the binaries compressed as given.
+
+    Returns the new wheel and the seconds it took to write it. RECORD holds
+    the hashes of the uncompressed members, so it stays valid.
+    """
+    compress_type, level = zip_compression(compression)
+    dest.mkdir(parents=True, exist_ok=True)
+    repacked = dest / wheel.name
+    start = time.perf_counter()
+    with zipfile.ZipFile(wheel) as src, zipfile.ZipFile(repacked, "w") as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if BINARY_MEMBER_PATTERN.search(info.filename):
+                dst.writestr(
+                    info, data, compress_type=compress_type, compresslevel=level
+                )
+            else:
+                dst.writestr(info, data)
+    return repacked, time.perf_counter() - start
+
+
+def install_command(installer: str, wheel: Path, target: Path) -> list[str]:
+    if installer == "pip":
+        return [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--quiet",
+            "--no-deps",
+            "--no-index",
+            "--no-cache-dir",
+            "--no-compile",
+            "--disable-pip-version-check",
+            "--root-user-action=ignore",
+            "--target",
+            str(target),
+            str(wheel),
+        ]
+    return [
+        "uv",
+        "pip",
+        "install",
+        "--quiet",
+        "--no-deps",
+        "--offline",
+        "--no-cache",
+        "--python",
+        sys.executable,
+        "--target",
+        str(target),
+        str(wheel),
+    ]
+
+
+def timed(command: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, check=True, stdin=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def benchmark(
+    wheel: Path, compression: str, installers: list[str], args: argparse.Namespace
+) -> CompressionResult:
+    repacked, repack_seconds = repack(wheel, compression, args.workdir / compression)
+    result = CompressionResult(
+        compression=compression,
+        wheel_size=repacked.stat().st_size,
+        repack_seconds=repack_seconds,
+        install_seconds={installer: [] for installer in installers},
+    )
+    for i in range(args.runs):
+        with tempfile.TemporaryDirectory(prefix="hugo-unzip-") as target:
+            start = time.perf_counter()
+            with zipfile.ZipFile(repacked) as archive:
+                archive.extractall(target)
+            result.unzip_seconds.append(time.perf_counter() - start)
+        for installer in installers:
+            with tempfile.TemporaryDirectory(prefix="hugo-install-") as target:
+                command = install_command(installer, repacked, Path(target))
+                result.install_seconds[installer].append(timed(command))
+        print(f"  {compression}: run {i + 1}/{args.runs}", flush=True)
+    return result
+
+
+def report(results: list[CompressionResult], installers: list[str]) -> None:
+    reference = next(
+        (r for r in results if r.compression == "deflate"), results[0]
+    ).wheel_size
+    header = "| compression | wheel (MB) | size | repack (s) | unzip (s) |"
+    rule = "| --- | ---: | ---: | ---: | ---: |"
+    for installer in installers:
+        header += f" {installer} install (s) |"
+        rule += " ---: |"
+    print(f"\n{header}\n{rule}")
+    for result in results:
+        row = (
+            f"| {result.compression} | {result.wheel_size / 2**20:.1f} "
+            f"| {result.wheel_size / reference:.0%} "
+            f"| {result.repack_seconds:.2f} "
+            f"| {statistics.median(result.unzip_seconds):.2f} |"
+        )
+        for installer in installers:
+            row += f" {statistics.median(result.install_seconds[installer]):.2f} |"
+        print(row)
+    print(
+        "\nSizes are relative to deflate, meson-python's default. Times are "
+        "medians over the measured runs."
+    )
+
+
+def main() -> int:
+    args = parse_args()
+    args.workdir = args.workdir.resolve()
+    wheel = args.wheel.resolve()
+    installers = [
+        installer
+        for installer in args.installers
+        if installer == "pip" or shutil.which(installer)
+    ]
+    skipped = sorted(set(args.installers) - set(installers))
+    if skipped:
+        print(f"Skipping installers not found on PATH: {', '.join(skipped)}")
+    for compression in args.compressions:
+        # Fail before the slow part on typos such as deflate-10.
+        if not re.fullmatch(r"stored|deflate(-[1-9])?", compression):
+            msg = f"unknown compression {compression!r}"
+            raise SystemExit(msg)
+
+    results = [
+        benchmark(wheel, compression, installers, args)
+        for compression in args.compressions
+    ]
+    report(results, installers)
+    if args.json:
+        data = {"wheel": wheel.name, "results": [asdict(r) for r in results]}
+        args.json.write_text(json.dumps(data, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+A content-addressed store of built Hugo binaries, shared between build
+directories, checkouts and machines, such as on a network file system.
+
+Binaries are stored by a key that hashes the inputs of the build (see
+build_hugo.build_inputs), so any build with the same Hugo commit, Go
+version, target, build tags and flags, and cgo settings (including the host
+C toolchain and libc for builds without Zig) can copy the binary instead of
+running `go install`. Writes go to a temporary file that is
+renamed into place, so readers never see a partial binary, and concurrent
+writers of the same key are harmless. The store is kept under a size cap by
+removing the least recently used binaries; each hit refreshes the binary's
+mtime, since atime is often not updated on shared storage.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?", re.IGNORECASE)
+SIZE_UNITS = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+# Temporary files older than this are left over from interrupted writes.
+STALE_TEMPORARY_SECONDS = 24 * 60 * 60
+
+
+def parse_size(value: str) -> int:
+    """Return the bytes in a size such as 500M, 10G or 10GiB."""
+    match = SIZE_PATTERN.fullmatch(value.strip())
+    if match is None:
+        msg = f"invalid size {value!r}, expected a number with an optional K, M, G or T suffix"
+        raise ValueError(msg)
+    return int(float(match[1]) * SIZE_UNITS[match[2].upper()])
+
+
+class BinaryStore:
+    def __init__(self, root: Path, max_size: int) -> None:
+        self.root = root
+        self.max_size = max_size
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _copy_atomically(self, source: Path, dest: Path) -> None:
+        tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            # Not copy2(): copies get the current mtime, both so that the
+            # stored mtime means "last used" and so that a fetched binary is
+            # not older than the build scripts that ninja compares it with.
+            shutil.copyfile(source, tmp)
+            shutil.copymode(source, tmp)
+            tmp.replace(dest)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """Copy the binary stored under `key` to `dest`, if there is one."""
+        path = self._path(key)
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            self._copy_atomically(path, dest)
+        except FileNotFoundError:
+            # Either a miss, or the binary was evicted while we copied it.
+            return False
+        # Marks the binary as recently used for eviction.
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return True
+
+    def publish(self, key: str, source: Path) -> None:
+        """Store the binary at `source` under `key`, then enforce the size cap."""
+        path = self._path(key)
+        if path.is_file():
+            os.utime(path)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._copy_atomically(source, path)
+        self.evict(keep=path)
+
+    def evict(self, keep: Path | None = None) -> list[Path]:
+        """Remove the least recently used binaries until the store fits its cap.
+
+        Returns the removed binaries. `keep` is never removed, so that a
+        binary larger than the cap can still be reused by the next build.
+        """
+        now = time.time()
+        entries = []
+        for path in self.root.glob("??/*"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.name.endswith(".tmp"):
+                if now - st.st_mtime > STALE_TEMPORARY_SECONDS:
+                    path.unlink(missing_ok=True)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed.append(path)
+        return removed
@@ -8,18 +8,55 @@ can also run this script standalone for debugging.
 from __future__ import annotations
 
 import argparse
+import hashlib
+import importlib.util
+import json
 import os
 import platform
 import re
+import shlex
 import shutil
 import stat
 import subprocess
 import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
 from pathlib import Path
 
+from binary_store import BinaryStore, parse_size
+from build_plan import from_environment
 from piwheels_go_toolchain import download_go_toolchain, is_32bit_arm_linux
 
 HUGO_VENDOR_NAME = "hugo-python-distributions"
+HUGO_BUILD_TAGS = "extended,withdeploy"
+
+# Environment variables that change the binary that `go install` produces
+FINGERPRINT_ENV_VARS = (
+    "GOOS",
+    "GOARCH",
+    "GOARM",
+    "GOROOT",
+    "GOFLAGS",
+    "GOAMD64",
+    "GOARM64",
+    "CGO_ENABLED",
+    "CC",
+    "CXX",
+    "CGO_CFLAGS",
+    "CGO_LDFLAGS",
+)
+
+# The environment variable that selects the microarchitecture level for the
+# GOARCH values that have one.
+ARCH_LEVEL_ENV_VARS = {"amd64": "GOAMD64", "arm64": "GOARM64"}
+
+# Set to 1 to also record Go's action graph for the build, and summarize its
+# per-package timings and build cache hits in the timings report.
+PROFILE_ENV_VAR = "PYHUGO_BUILD_PROFILE"
 
 
 HOST_GOOS = {
@@ -68,50 +105,138 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--use-zig", default="false")
     p.add_argument("--goos", default="")
     p.add_argument("--goarch", default="")
+    p.add_argument("--go-cache", default="")
+    p.add_argument("--go-mod-cache", default="")
+    p.add_argument("--binary-store", default="")
+    p.add_argument("--binary-store-size", default="10G")
+    # Build variants, used by scripts/benchmark_variants.py. The defaults are
+    # what the wheels ship with.
+    p.add_argument("--tags", default=HUGO_BUILD_TAGS)
+    p.add_argument("--trimpath", action=argparse.BooleanOptionalAction, default=True)
+    p.add_argument("--cgo-cflags", default="", help="override CGO_CFLAGS")
+    p.add_argument(
+        "--arch-level",
+        default="",
+        help="GOAMD64 or GOARM64 level, for amd64 and arm64 targets respectively",
+    )
+    p.add_argument(
+        "--pgo",
+        default="",
+        help='CPU profile for profile-guided optimisation, "auto" or "off" '
+        "(default: Go's own default)",
+    )
     return p.parse_args()
 
 
-def check_dependencies(go_binary: str, use_zig: bool) -> None:
+def resolve_cache_dir(env_var: str, option: str, default: Path) -> Path:
+    """Return the directory to use for GOCACHE or GOMODCACHE.
+
+    The environment variable takes precedence over the Meson option, which
+    takes precedence over the default inside the build directory's cache.
+    """
+    value = os.environ.get(env_var) or option
+    return Path(value).expanduser().resolve() if value else default
+
+
+# Probes that passed, keyed by the resolved executable (or module) path and
+# its mtime, so that repeat builds in the same build directory skip them.
+DEPENDENCY_CACHE_NAME = "dependency-probes.json"
+
+
+def _probe_key(command: list[str]) -> str | None:
+    """Return a cache key for a probe command, or None if it cannot run."""
+    if command[0] == sys.executable and command[1] == "-m":
+        spec = importlib.util.find_spec(command[2])
+        path = spec.origin if spec is not None else None
+    else:
+        path = shutil.which(command[0])
+    if path is None:
+        return None
+    resolved = Path(path).resolve()
     try:
-        subprocess.check_call(
-            [go_binary, "version"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-    except OSError as err:
-        msg = "Go toolchain not found. Please install Go from https://go.dev/dl/ or your package manager."
-        raise OSError(msg) from err
+        return f"{shlex.join(command)}:{resolved}:{resolved.stat().st_mtime_ns}"
+    except OSError:
+        return None
 
+
+def _probe(command: list[str]) -> bool:
     try:
         subprocess.check_call(
-            ["git", "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
         )
-    except OSError as err:
-        msg = "Git not found. Please install Git from https://git-scm.com/downloads or your package manager."
-        raise OSError(msg) from err
+    except OSError:
+        return False
+    return True
+
 
+def check_dependencies(
+    go_binary: str, use_zig: bool, cache: Path | None = None
+) -> None:
+    """Check that the build tools can be run, raising OSError if one cannot.
+
+    Each requirement is met if any of its commands runs. The commands are
+    started concurrently, and if `cache` is given, commands that ran before
+    with the same executable are not run again.
+    """
+    requirements: list[tuple[list[list[str]], str]] = [
+        (
+            [[go_binary, "version"]],
+            "Go toolchain not found. Please install Go from https://go.dev/dl/ or your package manager.",
+        ),
+        (
+            [["git", "--version"]],
+            "Git not found. Please install Git from https://git-scm.com/downloads or your package manager.",
+        ),
+    ]
     if use_zig:
-        try:
-            subprocess.check_call(
-                [sys.executable, "-m", "ziglang", "version"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
+        requirements.append(
+            (
+                [[sys.executable, "-m", "ziglang", "version"]],
+                "Zig compiler not found. Please install Zig from https://ziglang.org/download/, from PyPI as ziglang, or your package manager.",
             )
-        except OSError as err:
-            msg = "Zig compiler not found. Please install Zig from https://ziglang.org/download/, from PyPI as ziglang, or your package manager."
-            raise OSError(msg) from err
-        return
-
-    for cc in ("gcc", "clang"):
-        try:
-            subprocess.check_call(
-                [cc, "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    else:
+        requirements.append(
+            (
+                [["gcc", "--version"], ["clang", "--version"]],
+                "GCC/Clang not found. Please install GCC or Clang via your package manager.",
             )
-            return
-        except OSError:
-            continue
-    msg = "GCC/Clang not found. Please install GCC or Clang via your package manager."
-    raise OSError(msg)
+        )
+
+    cache_file = cache / DEPENDENCY_CACHE_NAME if cache is not None else None
+    try:
+        known = set(json.loads(cache_file.read_text())) if cache_file else set()
+    except (OSError, ValueError):
+        known = set()
+
+    keys = {
+        shlex.join(command): _probe_key(command)
+        for commands, _ in requirements
+        for command in commands
+    }
+
+    def satisfied(commands: list[list[str]]) -> bool:
+        return any(keys[shlex.join(command)] in known for command in commands)
+
+    to_run = [
+        command
+        for commands, _ in requirements
+        if not satisfied(commands)
+        for command in commands
+        if keys[shlex.join(command)] is not None
+    ]
+    if to_run:
+        with ThreadPoolExecutor(max_workers=len(to_run)) as pool:
+            for command, ok in zip(to_run, pool.map(_probe, to_run), strict=True):
+                if ok:
+                    known.add(keys[shlex.join(command)])
+
+    for commands, msg in requirements:
+        if not satisfied(commands):
+            raise OSError(msg)
+
+    if cache_file is not None:
+        cache_file.write_text(json.dumps(sorted(known)))
 
 
 def setup_zig_compiler(goos: str, goarch: str) -> None:
@@ -140,43 +265,155 @@ class SubmoduleVcsSwap:
 
     Submodules store a `.git` file that points into the parent repository's
     `.git/modules` directory. Go's VCS detection follows that link into the
-    parent repo and produces wrong metadata. We copy the actual git directory
-    into the submodule worktree temporarily and rewrite the worktree config
-    entry. This is restored on exit.
+    parent repo and produces wrong metadata. We put a minimal git directory
+    into the submodule worktree temporarily: copies of its HEAD, config,
+    index and refs, with the object database borrowed from the real git
+    directory through `objects/info/alternates` instead of being copied,
+    and the worktree config entry rewritten.
+
+    Concurrent builds from the same hugo-src, such as those of
+    build_targets.py --jobs, share that git directory, since they would all
+    write the same one. Each build registers itself in it, and the last one
+    to leave restores the `.git` file. Only these steps run under
+    hugo_src_lock(), so the Go builds themselves overlap.
     """
 
+    # Small files that `git status` and `git log -1` need besides objects
+    GIT_DIR_FILES = ("HEAD", "config", "index", "packed-refs", "shallow")
+
+    # The original .git file, and a file per build using the git directory,
+    # named after its process ID, both kept in the git directory.
+    SAVED_GIT_FILE = "pyhugo-gitfile"
+    USERS_DIR = "pyhugo-users"
+
     def __init__(self, hugo_src: Path) -> None:
+        self.hugo_src = hugo_src
         self.hugo_git = hugo_src / ".git"
-        self._saved: str | None = None
+        self._user: Path | None = None
 
     def __enter__(self) -> SubmoduleVcsSwap:
-        if not self.hugo_git.is_file():
-            return self
+        with hugo_src_lock(self.hugo_src):
+            if self.hugo_git.is_file():
+                self._swap()
+            elif not (self.hugo_git / self.SAVED_GIT_FILE).is_file():
+                # A standalone checkout, or an sdist without .git
+                return self
+            users = self.hugo_git / self.USERS_DIR
+            users.mkdir(exist_ok=True)
+            self._user = users / str(os.getpid())
+            self._user.touch()
+        return self
+
+    def _swap(self) -> None:
         content = self.hugo_git.read_text()
-        self._saved = content
         gitdir = content.strip().split("gitdir: ", 1)[1]
         gitdir_abs = (self.hugo_git.parent / gitdir).resolve()
         self.hugo_git.unlink()
-        shutil.copytree(str(gitdir_abs), str(self.hugo_git))
-        if sys.platform == "win32":
-            for p in self.hugo_git.rglob("*"):
-                if p.is_file():
-                    p.chmod(p.stat().st_mode | stat.S_IWRITE)
+        if (gitdir_abs / "objects").is_dir():
+            self._synthesize_git_dir(gitdir_abs)
+        else:
+            self._copy_git_dir(gitdir_abs)
+        (self.hugo_git / self.SAVED_GIT_FILE).write_text(content)
         config_file = self.hugo_git / "config"
         if config_file.exists():
             cfg = config_file.read_text()
             cfg = re.sub(r"worktree\s*=\s*[^\n]+", "worktree = ..", cfg)
             config_file.write_text(cfg)
-        return self
+
+    def _synthesize_git_dir(self, gitdir_abs: Path) -> None:
+        self.hugo_git.mkdir()
+        for name in self.GIT_DIR_FILES:
+            if (gitdir_abs / name).is_file():
+                shutil.copyfile(gitdir_abs / name, self.hugo_git / name)
+        if (gitdir_abs / "refs").is_dir():
+            shutil.copytree(gitdir_abs / "refs", self.hugo_git / "refs")
+        else:
+            (self.hugo_git / "refs").mkdir()
+        info = self.hugo_git / "objects" / "info"
+        info.mkdir(parents=True)
+        (info / "alternates").write_text(f"{(gitdir_abs / 'objects').as_posix()}\n")
+
+    def _copy_git_dir(self, gitdir_abs: Path) -> None:
+        # Fallback for git directories without their own object database
+        shutil.copytree(str(gitdir_abs), str(self.hugo_git))
+        if sys.platform == "win32":
+            for p in self.hugo_git.rglob("*"):
+                if p.is_file():
+                    p.chmod(p.stat().st_mode | stat.S_IWRITE)
+
+    @staticmethod
+    def _prune_users(users: Path) -> None:
+        # Builds that were killed leave their file behind. Only POSIX can
+        # check whether a process exists without affecting it.
+        if sys.platform == "win32":
+            return
+        for user in users.iterdir():
+            try:
+                os.kill(int(user.name), 0)
+            except ProcessLookupError:
+                user.unlink(missing_ok=True)
+            except (ValueError, PermissionError):
+                pass
 
     def __exit__(self, *exc: object) -> None:
-        if self._saved is None:
+        if self._user is None:
             return
-        if self.hugo_git.is_dir() and not self.hugo_git.is_symlink():
+        with hugo_src_lock(self.hugo_src):
+            self._user.unlink(missing_ok=True)
+            self._prune_users(self._user.parent)
+            if any(self._user.parent.iterdir()):
+                return
+            saved = (self.hugo_git / self.SAVED_GIT_FILE).read_text()
             shutil.rmtree(self.hugo_git)
-        elif self.hugo_git.exists() or self.hugo_git.is_symlink():
-            self.hugo_git.unlink()
-        self.hugo_git.write_text(self._saved)
+            self.hugo_git.write_text(saved)
+
+
+@contextmanager
+def hugo_src_lock(hugo_src: Path) -> Iterator[None]:
+    """Hold an exclusive lock on `hugo_src` while the context is active.
+
+    Builds of several targets from the same hugo-src, with build_targets.py
+    --jobs or the extra_arch_levels targets, take it while they set up or
+    remove the `.git` directory that SubmoduleVcsSwap puts in place, and
+    while they run git or write the `.hugo_commit_date` stamp. The lock is
+    not reentrant. The lock file is named after the path of hugo-src and
+    kept in the temporary directory, out of the checkout.
+    """
+    digest = hashlib.sha256(str(hugo_src).encode()).hexdigest()[:16]
+    path = Path(tempfile.gettempdir()) / f"pyhugo-src-{digest}.lock"
+    with path.open("a+b") as file:
+        if sys.platform == "win32":
+            import msvcrt
+
+            file.seek(0)
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                print(f"Waiting for another build of {hugo_src}", flush=True)
+                while True:
+                    try:
+                        # Gives up with an OSError after about ten seconds.
+                        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            try:
+                fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                print(f"Waiting for another build of {hugo_src}", flush=True)
+                fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
 
 
 def get_hugo_commit_date(hugo_src: Path) -> str:
@@ -203,6 +440,154 @@ def get_hugo_commit_date(hugo_src: Path) -> str:
     return ""
 
 
+def get_hugo_commit(hugo_src: Path) -> str | None:
+    """Return the Hugo submodule's HEAD commit.
+
+    Returns None when it cannot be determined (such as for sdist builds) or
+    when there are uncommitted changes or untracked files, since the commit
+    alone does not describe the sources then. The commit date stamp that
+    get_hugo_commit_date() writes is not counted.
+    """
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=hugo_src,
+            text=True,
+            stderr=subprocess.DEVNULL,
+        ).strip()
+        status = subprocess.check_output(
+            [
+                "git",
+                "status",
+                "--porcelain",
+                "--untracked-files=all",
+                "--",
+                ".",
+                ":(exclude).hugo_commit_date",
+            ],
+            cwd=hugo_src,
+            text=True,
+            stderr=subprocess.DEVNULL,
+        )
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    return commit if commit and not status.strip() else None
+
+
+def build_inputs(
+    go_binary: str,
+    hugo_src: Path,
+    build_flags: list[str],
+    pgo_profile: Path | None = None,
+) -> dict[str, str] | None:
+    """Collect everything that determines the built binary, or None if unknown."""
+    commit = get_hugo_commit(hugo_src)
+    if commit is None:
+        return None
+    inputs = {
+        "hugo_commit": commit,
+        "go_version": subprocess.check_output(
+            [go_binary, "version"], text=True
+        ).strip(),
+        "build_flags": shlex.join(build_flags),
+    }
+    # A profile inside hugo-src is covered by the commit, but one passed by
+    # path can change without its path changing.
+    if pgo_profile is not None:
+        inputs["pgo_profile"] = hashlib.sha256(pgo_profile.read_bytes()).hexdigest()
+    for name in FINGERPRINT_ENV_VARS:
+        inputs[name] = os.environ.get(name, "")
+    return inputs
+
+
+def resolve_pgo(value: str, hugo_src: Path) -> tuple[str, Path | None]:
+    """Return the -pgo value for `go install` and the profile file, if any.
+
+    "auto" and "off" are passed on to Go. With "auto", Go uses default.pgo
+    in the main package, which is the root of hugo-src.
+    """
+    if value in ("auto", "off"):
+        if value == "auto" and not (hugo_src / "default.pgo").is_file():
+            print(
+                f"Warning: there is no default.pgo in {hugo_src}, building without PGO",
+                file=sys.stderr,
+            )
+        return value, None
+    profile = Path(value).expanduser().resolve()
+    if not profile.is_file():
+        msg = f"PGO profile {value} does not exist"
+        raise OSError(msg)
+    return str(profile), profile
+
+
+def fingerprint(inputs: dict[str, str]) -> str:
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def native_toolchain(go_binary: str) -> dict[str, str]:
+    """Identify the host C toolchain that cgo uses in builds without Zig.
+
+    Zig builds name their target and libc in CC, but native builds link
+    against the host's compiler and, on Linux, its glibc, which the store
+    key must tell apart across machines. CC and CXX are resolved with
+    `go env`, since Go picks a default compiler when they are not set.
+    """
+    toolchain = {}
+    compilers = subprocess.check_output(
+        [go_binary, "env", "CC", "CXX"], text=True
+    ).splitlines()
+    for name, compiler in zip(("cc_version", "cxx_version"), compilers, strict=False):
+        try:
+            version = subprocess.check_output(
+                [*shlex.split(compiler), "--version"],
+                text=True,
+                stderr=subprocess.STDOUT,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            version = compiler
+        # Later lines can hold installation paths, such as clang's InstalledDir.
+        toolchain[name] = version.strip().split("\n", 1)[0]
+    if sys.platform.startswith("linux"):
+        toolchain["libc"] = " ".join(platform.libc_ver())
+    return toolchain
+
+
+def store_key(inputs: dict[str, str], toolchain: dict[str, str] | None = None) -> str:
+    """Return the key of the build in a shared binary store.
+
+    Unlike fingerprint(), which compares builds in the same build directory,
+    this has to match across checkouts and machines, so it leaves out the
+    paths that only locate the toolchains: Go is identified by its version,
+    Zig by its command line without the Python interpreter's path, and a PGO
+    profile by its hash. Builds without Zig pass the host C toolchain from
+    native_toolchain().
+    """
+    portable = {name: value for name, value in inputs.items() if name != "GOROOT"}
+    portable.update(toolchain or {})
+    for name in ("CC", "CXX"):
+        portable[name] = portable[name].replace(sys.executable, "python")
+    if "pgo_profile" in inputs:
+        portable["build_flags"] = shlex.join(
+            flag
+            for flag in shlex.split(inputs["build_flags"])
+            if not flag.startswith("-pgo=")
+        )
+    return fingerprint(portable)
+
+
+def open_binary_store(option: str, size: str) -> BinaryStore | None:
+    """Return the shared binary store, if one is configured.
+
+    The environment variables take precedence over the Meson options, as for
+    the Go caches.
+    """
+    root = os.environ.get("PYHUGO_BINARY_STORE") or option
+    if not root:
+        return None
+    max_size = parse_size(os.environ.get("PYHUGO_BINARY_STORE_SIZE") or size)
+    return BinaryStore(Path(root).expanduser().resolve(), max_size)
+
+
 def locate_built_binary(gopath: Path, goos: str, goarch: str, exe_ext: str) -> Path:
     """Find the binary that ``go install`` produced.
 
@@ -217,6 +602,79 @@ def locate_built_binary(gopath: Path, goos: str, goarch: str, exe_ext: str) -> P
     return gopath / "bin" / ("hugo" + exe_ext)
 
 
+class BuildTimings:
+    """Wall times of the build's phases, written as JSON next to the output."""
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - start, 3)
+
+    def write(self, path: Path, **extra: object) -> None:
+        report = {
+            "total": round(time.perf_counter() - self.start, 3),
+            "phases": self.phases,
+            **extra,
+        }
+        path.write_text(json.dumps(report, indent=2) + "\n")
+
+
+def _go_duration(start: str, done: str) -> float:
+    """Return the seconds between two RFC 3339 timestamps from Go."""
+
+    def parse(value: str) -> float:
+        # Go writes up to nine fraction digits and drops trailing zeros, but
+        # datetime only parses exactly three or six before Python 3.11.
+        value = re.sub(
+            r"\.(\d+)", lambda m: "." + m[1][:6].ljust(6, "0"), value, count=1
+        ).replace("Z", "+00:00")
+        return datetime.fromisoformat(value).timestamp()
+
+    return parse(done) - parse(start)
+
+
+def summarize_action_graph(path: Path) -> dict[str, object]:
+    """Summarize `go build -debug-actiongraph` output.
+
+    Build actions that ran no compiler command were served from the Go build
+    cache, so their share of all build actions is the cache hit rate.
+    """
+    actions = json.loads(path.read_text())
+    builds = [a for a in actions if a.get("Mode") == "build"]
+    compiled = [a for a in builds if a.get("Cmd")]
+    links = [a for a in actions if a.get("Mode") == "link" and a.get("TimeStart")]
+    slowest = sorted(compiled, key=lambda a: a.get("CmdReal", 0), reverse=True)[:10]
+    cache_hits = len(builds) - len(compiled)
+
+    return {
+        "actions": len(actions),
+        "build_actions": len(builds),
+        "compiled": len(compiled),
+        "cache_hits": cache_hits,
+        "cache_hit_rate": round(cache_hits / len(builds), 3) if builds else None,
+        # Sum of per-package compiler wall times. Packages compile in
+        # parallel, so this is usually more than the go_install phase.
+        "compile_seconds": round(sum(a.get("CmdReal", 0) for a in compiled) / 1e9, 3),
+        "link_seconds": round(
+            sum(_go_duration(a["TimeStart"], a["TimeDone"]) for a in links), 3
+        ),
+        "slowest_packages": [
+            {
+                "package": a.get("Package"),
+                "seconds": round(a.get("CmdReal", 0) / 1e9, 3),
+            }
+            for a in slowest
+        ],
+    }
+
+
 def main() -> int:
     args = parse_args()
     use_zig = args.use_zig.lower() == "true"
@@ -225,69 +683,166 @@ def main() -> int:
     cache = args.cache.resolve()
     hugo_src = args.hugo_src.resolve()
     output = args.output.resolve()
+    timings = BuildTimings()
+    profile = os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0")
 
     cache.mkdir(parents=True, exist_ok=True)
-    shutil.rmtree(cache / "bin", ignore_errors=True)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    # The plan the PEP 517 wrapper resolved for this build, if it was run
+    # through one, so that the host is not probed again.
+    plan = from_environment()
 
     go_binary, go_goroot = "go", None
-    if is_32bit_arm_linux():
+    if plan.download_go if plan else is_32bit_arm_linux():
         # It is impossible for go-bin to ship armv6l/armv7l wheels as it
         # just bundles the downloaded Go toolchain, so we need to download
         # it ourselves for piwheels.
-        go_binary, go_goroot = download_go_toolchain(cache)
+        with timings.phase("go_toolchain"):
+            go_binary, go_goroot = download_go_toolchain(cache)
 
-    check_dependencies(go_binary, use_zig)
+    with timings.phase("check_dependencies"):
+        check_dependencies(go_binary, use_zig, cache)
 
     if go_goroot:
         os.environ.setdefault("GOROOT", go_goroot)
 
     os.environ["CGO_ENABLED"] = "1"
     os.environ["GO111MODULE"] = "on"
+    # GOPATH stays per build directory, since `go install` writes the binary
+    # to $GOPATH/bin. The build and module caches only hold content-addressed
+    # or read-only data, so they can be shared between build directories,
+    # targets and Python versions.
     os.environ["GOPATH"] = str(cache)
-    os.environ["GOCACHE"] = str(cache)
+    go_cache = (plan.go_cache if plan else "") or args.go_cache
+    go_mod_cache = (plan.go_mod_cache if plan else "") or args.go_mod_cache
+    os.environ["GOCACHE"] = str(
+        resolve_cache_dir("PYHUGO_GOCACHE", go_cache, cache / "go-build")
+    )
+    os.environ["GOMODCACHE"] = str(
+        resolve_cache_dir("PYHUGO_GOMODCACHE", go_mod_cache, cache / "pkg" / "mod")
+    )
     os.environ["GOOS"] = goos
     os.environ["GOARCH"] = goarch
 
+    if args.arch_level:
+        level_var = ARCH_LEVEL_ENV_VARS.get(goarch)
+        if level_var is None:
+            msg = f"--arch-level is not supported for GOARCH={goarch}"
+            raise OSError(msg)
+        os.environ[level_var] = args.arch_level
+
     if goarch == "arm" and goos == "linux":
         default_goarm = "6" if platform.machine() == "armv6l" else "7"
         os.environ.setdefault("GOARM", default_goarm)
 
     if use_zig:
         setup_zig_compiler(goos, goarch)
+    if args.cgo_cflags:
+        os.environ["CGO_CFLAGS"] = args.cgo_cflags
 
     ldflags = [
         f"-s -w -X github.com/gohugoio/hugo/common/hugo.vendorInfo={HUGO_VENDOR_NAME}",
     ]
-    commit_date = get_hugo_commit_date(hugo_src)
+    # Other builds from the same hugo-src may be setting up or removing its
+    # swapped .git directory (see SubmoduleVcsSwap), so git runs in hugo-src
+    # under the lock.
+    with hugo_src_lock(hugo_src):
+        commit_date = get_hugo_commit_date(hugo_src)
     if commit_date:
         ldflags.append(
             f"-X github.com/gohugoio/hugo/common/hugo.buildDate={commit_date}",
         )
     if goos == "windows":
         ldflags.append("-extldflags '-static'")
-
-    with SubmoduleVcsSwap(hugo_src):
-        subprocess.check_call(
-            [
-                go_binary,
-                "install",
-                "-trimpath",
-                "-v",
-                "-ldflags",
-                " ".join(ldflags),
-                "-tags",
-                "extended,withdeploy",
-            ],
-            cwd=hugo_src,
-        )
-
+    build_flags = ["-ldflags", " ".join(ldflags), "-tags", args.tags]
+    if args.trimpath:
+        build_flags.insert(0, "-trimpath")
+    pgo_profile = None
+    if args.pgo:
+        pgo, pgo_profile = resolve_pgo(args.pgo, hugo_src)
+        build_flags.append(f"-pgo={pgo}")
+
+    # The fingerprint sits next to the binary that `go install` produced. If
+    # it matches the current inputs, that binary is reused as is and we skip
+    # the Go build (and its link step) entirely.
     exe_ext = ".exe" if goos == "windows" else ""
     built = locate_built_binary(cache, goos, goarch, exe_ext)
-    output.parent.mkdir(parents=True, exist_ok=True)
-    if output.exists():
-        output.unlink()
-    shutil.copy2(built, output)
-    output.chmod(output.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    fingerprint_file = built.with_name(built.name + ".fingerprint")
+    with timings.phase("fingerprint"), hugo_src_lock(hugo_src):
+        inputs = build_inputs(go_binary, hugo_src, build_flags, pgo_profile)
+        current = fingerprint(inputs) if inputs is not None else None
+        previous = fingerprint_file.read_text() if fingerprint_file.is_file() else None
+
+    action_graph = output.with_name(output.name + ".actiongraph.json")
+    go_build: dict[str, object] | None = None
+    reused = current is not None and current == previous and built.is_file()
+    store = open_binary_store(args.binary_store, args.binary_store_size)
+    key = None
+    if store is not None and inputs is not None:
+        key = store_key(inputs, None if use_zig else native_toolchain(go_binary))
+    # "off", "hit", "miss", or "local" if the build directory's binary was
+    # reused without asking the store.
+    store_status = "off" if key is None else "local"
+    if reused:
+        print(f"Hugo build inputs are unchanged, reusing {built}")
+    else:
+        shutil.rmtree(cache / "bin", ignore_errors=True)
+        # Binaries are stored where a native `go install` puts them, so that
+        # the fingerprint check above finds them next time.
+        built = cache / "bin" / ("hugo" + exe_ext)
+        fingerprint_file = built.with_name(built.name + ".fingerprint")
+        if key is not None:
+            with timings.phase("binary_store_fetch"):
+                try:
+                    reused = store.fetch(key, built)
+                except OSError as e:
+                    print(f"Warning: could not read {store.root}: {e}", file=sys.stderr)
+            store_status = "hit" if reused else "miss"
+        if reused:
+            print(f"Reusing the Hugo binary {key} from {store.root}")
+            fingerprint_file.write_text(current)
+    if not reused:
+        command = [go_binary, "install", "-v", *build_flags]
+        if profile:
+            command.append(f"-debug-actiongraph={action_graph}")
+        with ExitStack() as stack:
+            with timings.phase("vcs_swap"):
+                stack.enter_context(SubmoduleVcsSwap(hugo_src))
+            with timings.phase("go_install"):
+                subprocess.check_call(command, cwd=hugo_src)
+        built = locate_built_binary(cache, goos, goarch, exe_ext)
+        fingerprint_file = built.with_name(built.name + ".fingerprint")
+        if current is not None:
+            fingerprint_file.write_text(current)
+        if profile and action_graph.is_file():
+            go_build = summarize_action_graph(action_graph)
+    # Also publishes binaries that were built before the store was set up.
+    if key is not None and store_status != "hit":
+        with timings.phase("binary_store_publish"):
+            try:
+                store.publish(key, built)
+            except OSError as e:
+                # The binary is built either way, the store only saves
+                # later builds from building it again.
+                print(f"Warning: could not write {store.root}: {e}", file=sys.stderr)
+
+    with timings.phase("copy"):
+        if output.exists():
+            output.unlink()
+        # copyfile() gives the output a new mtime. A reused binary keeps the
+        # mtime of the build that produced it, which can be older than this
+        # script, and ninja would then consider the output out of date on
+        # every run.
+        shutil.copyfile(built, output)
+        output.chmod(built.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    timings.write(
+        output.with_name(output.name + ".timings.json"),
+        go_install_skipped=reused,
+        binary_store=store_status,
+        go_build=go_build,
+    )
     return 0
 
 
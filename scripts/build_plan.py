@@ -0,0 +1,231 @@
+"""
+Resolves the facts a build needs from the PEP 517 config_settings and the
+host once, so that hugo_meson_python_wrapper.py's hooks and build_hugo.py
+do not each re-derive them.
+
+The plan is written as JSON into the Meson build directory when one is
+given with -Cbuild-dir, so that later hooks in other processes (frontends
+run each hook in a fresh one) load it instead of parsing the cross file
+again. The wrapper points build_hugo.py at the plan through the
+PYHUGO_BUILD_PLAN environment variable.
+"""
+
+from __future__ import annotations
+
+import configparser
+import contextlib
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import sys
+import zipfile
+from pathlib import Path
+from typing import Any
+
+from piwheels_go_toolchain import is_32bit_arm_linux
+
+PLAN_FILE_NAME = "hugo-build-plan.json"
+PLAN_ENV_VAR = "PYHUGO_BUILD_PLAN"
+
+# (host_machine.system, host_machine.cpu_family) -> _PYTHON_HOST_PLATFORM
+PLATFORM_TAGS_MAP: dict[tuple[str, str], str] = {
+    ("linux", "x86_64"): "linux_x86_64",
+    ("linux", "aarch64"): "linux_aarch64",
+    ("linux", "arm"): "linux_armv7l",
+    ("linux", "x86"): "linux_i686",
+    ("linux", "ppc64"): "linux_ppc64le",
+    ("linux", "s390x"): "linux_s390x",
+    ("linux", "riscv64"): "linux_riscv64",
+    ("windows", "x86_64"): "win_amd64",
+    ("windows", "aarch64"): "win_arm64",
+    ("windows", "x86"): "win32",
+    (
+        "darwin",
+        "x86_64",
+    ): "macosx_10_13_x86_64",  # TODO: figure out what to do about MACOSX_DEPLOYMENT_TARGET
+    (
+        "darwin",
+        "aarch64",
+    ): "macosx_11_0_arm64",  # TODO: figure out what to do about MACOSX_DEPLOYMENT_TARGET
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class BuildPlan:
+    # Identifies the inputs the plan was resolved from, see _plan_key().
+    key: str
+    # (host_machine.system, host_machine.cpu_family) from the cross file, or
+    # None for native builds.
+    target: tuple[str, str] | None
+    # The wheel platform tag to force for cross builds, if the target has one.
+    platform_tag: str | None
+    use_zig: bool
+    native_launcher: bool
+    # How the Hugo binaries are compressed in the wheel, see the
+    # binary_compression option.
+    binary_compression: str
+    # True if the Go toolchain is downloaded by build_hugo.py, because go-bin
+    # has no wheels for the host (32-bit ARM Linux, i.e. piwheels).
+    download_go: bool
+    # GOCACHE and GOMODCACHE overrides from the environment or setup-args,
+    # or "" for the defaults inside the build directory.
+    go_cache: str
+    go_mod_cache: str
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(dataclasses.asdict(self), indent=2))
+        tmp.replace(path)
+
+    @classmethod
+    def read(cls, path: Path) -> BuildPlan | None:
+        try:
+            data = json.loads(path.read_text())
+            if data["target"] is not None:
+                data["target"] = tuple(data["target"])
+            return cls(**data)
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+
+def _flatten(value: Any) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def _strip_quotes(string: str) -> str:
+    return string.strip().strip("'\"")
+
+
+def _setup_args(config_settings: dict[str, Any] | None) -> list[str]:
+    return _flatten(config_settings.get("setup-args") if config_settings else None)
+
+
+def _option(setup_args: list[str], name: str) -> str | None:
+    """Return the last -D<name>=<value> in setup-args, or None."""
+    value = None
+    for arg in setup_args:
+        if arg.startswith(f"-D{name}="):
+            value = arg.split("=", 1)[1]
+    return value
+
+
+def _cross_file(setup_args: list[str]) -> Path | None:
+    for arg in setup_args:
+        m = re.match(r"--cross-file[= ](.+)$", arg)
+        if m:
+            return Path(m.group(1))
+    return None
+
+
+def _parse_cross_file(cross_file: Path | None) -> tuple[str, str] | None:
+    """Return (system, cpu_family) from a Meson cross file, or None."""
+    if cross_file is None or not cross_file.exists():
+        return None
+
+    cfg = configparser.ConfigParser()
+    cfg.read(cross_file)
+    if "host_machine" not in cfg:
+        return None
+
+    system = _strip_quotes(cfg["host_machine"].get("system", ""))
+    family = _strip_quotes(cfg["host_machine"].get("cpu_family", ""))
+    return (system, family) if system and family else None
+
+
+def _plan_key(setup_args: list[str], cross_file: Path | None) -> str:
+    """Hash everything a plan is resolved from, other than the cross file's content.
+
+    The cross file is covered by its path and mtime instead, so that checking
+    a stored plan is cheaper than resolving a new one.
+    """
+    try:
+        cross_mtime = cross_file.stat().st_mtime_ns if cross_file else None
+    except OSError:
+        cross_mtime = None
+    inputs = {
+        "setup_args": setup_args,
+        "cross_file": [str(cross_file), cross_mtime] if cross_file else None,
+        "env": [os.environ.get(v, "") for v in ("PYHUGO_GOCACHE", "PYHUGO_GOMODCACHE")],
+        "python": sys.executable,
+    }
+    return hashlib.sha256(json.dumps(inputs).encode()).hexdigest()
+
+
+def _use_zig(setup_args: list[str], target: tuple[str, str] | None) -> bool:
+    """Return True if the Zig compiler is needed for this build.
+
+    We do `auto_use_zig = meson.is_cross_build() and host_sys != 'darwin'`.
+    It maps here. An explicit -Duse_zig=true/false in setup-args overrides
+    the auto logic.
+    """
+    if target is None:
+        return False
+    use_zig = _option(setup_args, "use_zig")
+    if use_zig in ("true", "false"):
+        return use_zig == "true"
+    system, _ = target
+    return system != "darwin"
+
+
+def resolve(config_settings: dict[str, Any] | None) -> BuildPlan:
+    """Return the build plan for `config_settings`.
+
+    A plan stored in the build directory is reused if it was resolved from
+    the same inputs, and a newly resolved plan is stored there.
+    """
+    setup_args = _setup_args(config_settings)
+    cross_file = _cross_file(setup_args)
+    key = _plan_key(setup_args, cross_file)
+
+    build_dir = (config_settings or {}).get("build-dir")
+    plan_file = Path(build_dir, PLAN_FILE_NAME) if build_dir else None
+    if plan_file is not None:
+        plan = BuildPlan.read(plan_file)
+        if plan is not None and plan.key == key:
+            return plan
+
+    target = _parse_cross_file(cross_file)
+    plan = BuildPlan(
+        key=key,
+        target=target,
+        platform_tag=None if target is None else PLATFORM_TAGS_MAP.get(target),
+        use_zig=_use_zig(setup_args, target),
+        native_launcher=_option(setup_args, "native_launcher") == "true",
+        binary_compression=_option(setup_args, "binary_compression") or "deflate",
+        download_go=is_32bit_arm_linux(),
+        go_cache=os.environ.get("PYHUGO_GOCACHE")
+        or _option(setup_args, "go_cache")
+        or "",
+        go_mod_cache=(
+            os.environ.get("PYHUGO_GOMODCACHE")
+            or _option(setup_args, "go_mod_cache")
+            or ""
+        ),
+    )
+    if plan_file is not None:
+        # Storing the plan only saves work for later hooks.
+        with contextlib.suppress(OSError):
+            plan.write(plan_file)
+    return plan
+
+
+def zip_compression(value: str) -> tuple[int, int | None]:
+    """Return the zipfile compression type and level for binary_compression."""
+    if value == "stored":
+        return zipfile.ZIP_STORED, None
+    if value == "deflate":
+        return zipfile.ZIP_DEFLATED, None
+    return zipfile.ZIP_DEFLATED, int(value.removeprefix("deflate-"))
+
+
+def from_environment() -> BuildPlan | None:
+    """Return the plan the wrapper handed to this build, if any."""
+    path = os.environ.get(PLAN_ENV_VAR)
+    return BuildPlan.read(Path(path)) if path else None
@@ -0,0 +1,189 @@
+"""
+Builds wheels for several GOOS/GOARCH targets concurrently, all sharing one
+Go build cache and one Go module cache, and reports the wall time, wheel
+size and Hugo binary size for each target.
+
+Cross files come from generate_meson_cross_file.render(), and each target
+gets its own Meson build directory so that repeated runs are incremental.
+Every target's build log is written to <workdir>/logs/<goos>-<goarch>.log.
+
+Usage:
+    python scripts/build_targets.py [--targets linux/amd64,windows/arm64] [--jobs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from build_hugo import HOST_GOARCH, HOST_GOOS
+from generate_meson_cross_file import HOST_MACHINE_MAP, render
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class TargetResult:
+    goos: str
+    goarch: str
+    returncode: int
+    duration: float
+    log: Path
+    wheel: Path | None = None
+    wheel_size: int = 0
+    binary_size: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.goos}/{self.goarch}"
+
+
+def default_targets() -> list[tuple[str, str]]:
+    """Return every target that can be built from this host.
+
+    macOS targets need the macOS SDK, so they are only included on macOS.
+    """
+    return [
+        (goos, goarch)
+        for goos, goarch in HOST_MACHINE_MAP
+        if goos != "darwin" or HOST_GOOS == "darwin"
+    ]
+
+
+def parse_targets(value: str) -> list[tuple[str, str]]:
+    targets = []
+    for item in value.split(","):
+        goos, _, goarch = item.strip().partition("/")
+        if (goos, goarch) not in HOST_MACHINE_MAP:
+            msg = f"unsupported target {item!r}, expected GOOS/GOARCH"
+            raise argparse.ArgumentTypeError(msg)
+        targets.append((goos, goarch))
+    return targets
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--targets", type=parse_targets, default=default_targets())
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=max(1, (os.cpu_count() or 1) // 4),
+        help="number of targets to build at once (default: a quarter of the CPUs, "
+        "since each Go build is parallel by itself)",
+    )
+    p.add_argument("--outdir", type=Path, default=ROOT / "dist")
+    p.add_argument("--workdir", type=Path, default=ROOT / "build" / "targets")
+    p.add_argument("--no-isolation", action="store_true")
+    return p.parse_args()
+
+
+def binary_size(wheel: Path) -> int:
+    with zipfile.ZipFile(wheel) as whl:
+        for info in whl.infolist():
+            if info.filename.endswith(("hugo/binaries/hugo", "hugo/binaries/hugo.exe")):
+                return info.file_size
+    return 0
+
+
+def build_target(
+    goos: str, goarch: str, args: argparse.Namespace, env: dict[str, str]
+) -> TargetResult:
+    target_dir = args.workdir / f"{goos}-{goarch}"
+    wheel_dir = target_dir / "dist"
+    shutil.rmtree(wheel_dir, ignore_errors=True)
+    log = args.workdir / "logs" / f"{goos}-{goarch}.log"
+
+    command = [
+        sys.executable,
+        "-m",
+        "build",
+        "--wheel",
+        "--outdir",
+        str(wheel_dir),
+        f"-Cbuild-dir={target_dir / 'build'}",
+    ]
+    if args.no_isolation:
+        command.append("--no-isolation")
+    if (goos, goarch) != (HOST_GOOS, HOST_GOARCH):
+        cross_file = target_dir / "cross.ini"
+        cross_file.write_text(render(goos, goarch))
+        command.append(f"-Csetup-args=--cross-file={cross_file}")
+
+    start = time.perf_counter()
+    with log.open("w") as file:
+        returncode = subprocess.call(
+            command, cwd=ROOT, env=env, stdout=file, stderr=subprocess.STDOUT
+        )
+    result = TargetResult(goos, goarch, returncode, time.perf_counter() - start, log)
+
+    wheels = sorted(wheel_dir.glob("*.whl"))
+    if returncode == 0 and wheels:
+        wheel = args.outdir / wheels[0].name
+        shutil.move(wheels[0], wheel)
+        result.wheel = wheel
+        result.wheel_size = wheel.stat().st_size
+        result.binary_size = binary_size(wheel)
+    return result
+
+
+def report(results: list[TargetResult], wall_time: float) -> None:
+    print(f"\n{'target':<16} {'status':<7} {'time':>8} {'wheel':>10} {'binary':>10}")
+    for result in sorted(results, key=lambda r: r.name):
+        status = "ok" if result.wheel else f"rc={result.returncode}"
+        print(
+            f"{result.name:<16} {status:<7} {result.duration:>7.1f}s "
+            f"{result.wheel_size / 2**20:>8.1f}MB {result.binary_size / 2**20:>8.1f}MB"
+        )
+    serial = sum(result.duration for result in results)
+    print(f"\nwall time {wall_time:.1f}s, sum of target times {serial:.1f}s")
+    for result in results:
+        if not result.wheel:
+            print(f"{result.name} failed, see {result.log}", file=sys.stderr)
+
+
+def main() -> int:
+    args = parse_args()
+    args.outdir = args.outdir.resolve()
+    args.workdir = args.workdir.resolve()
+    args.outdir.mkdir(parents=True, exist_ok=True)
+    for goos, goarch in args.targets:
+        (args.workdir / f"{goos}-{goarch}").mkdir(parents=True, exist_ok=True)
+    (args.workdir / "logs").mkdir(parents=True, exist_ok=True)
+
+    # All targets share these through build_hugo.py, so dependencies are
+    # downloaded once and compiled once per GOOS/GOARCH, and concurrent Go
+    # builds coordinate through the caches' own locking.
+    env = dict(os.environ)
+    env.setdefault("PYHUGO_GOCACHE", str(args.workdir / "go-build"))
+    env.setdefault("PYHUGO_GOMODCACHE", str(args.workdir / "go-mod"))
+
+    # The builds themselves run in child processes, so threads are enough to
+    # drive them.
+    start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [
+            pool.submit(build_target, goos, goarch, args, env)
+            for goos, goarch in args.targets
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            print(
+                f"{result.name}: {'ok' if result.wheel else 'failed'} in {result.duration:.1f}s"
+            )
+            results.append(result)
+
+    report(results, time.perf_counter() - start)
+    return 0 if all(result.wheel for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
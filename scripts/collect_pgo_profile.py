@@ -0,0 +1,104 @@
+"""
+Collects a CPU profile for building Hugo with profile-guided optimisation.
+
+Hugo builds the documentation site and synthetic sites of the given sizes
+(see generate_site.py) with --profile-cpu, and the profiles are merged with
+`go tool pprof` into a single profile for the `pgo` Meson option.
+
+Usage:
+    python scripts/collect_pgo_profile.py [--output build/pgo/hugo.pgo] [--pages 1000,10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from generate_site import generate_site
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_pages(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("--output", type=Path, default=ROOT / "build" / "pgo" / "hugo.pgo")
+    p.add_argument(
+        "--pages",
+        type=parse_pages,
+        default=[1000, 10000],
+        help="sizes of the synthetic sites to profile (default: 1000,10000)",
+    )
+    p.add_argument("--no-docs", action="store_true", help="do not profile docs/")
+    p.add_argument(
+        "--hugo",
+        type=Path,
+        help="Hugo binary to profile (default: the installed hugo package's)",
+    )
+    p.add_argument("--go", default="go", help="Go binary used to merge the profiles")
+    return p.parse_args()
+
+
+def profile_site(hugo: Path, site: Path, profile: Path) -> None:
+    with tempfile.TemporaryDirectory(prefix="hugo-pgo-") as destination:
+        start = time.perf_counter()
+        subprocess.run(
+            [
+                str(hugo),
+                "build",
+                "--source",
+                str(site),
+                "--destination",
+                destination,
+                "--quiet",
+                "--profile-cpu",
+                str(profile),
+            ],
+            check=True,
+        )
+    print(f"Profiled {site} in {time.perf_counter() - start:.1f}s")
+
+
+def main() -> int:
+    args = parse_args()
+    if args.hugo is None:
+        from hugo.api import executable
+
+        args.hugo = executable()
+
+    output = args.output.resolve()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="hugo-pgo-") as tmp:
+        workdir = Path(tmp)
+        profiles = []
+        if not args.no_docs:
+            profiles.append(workdir / "docs.pprof")
+            profile_site(args.hugo, ROOT / "docs", profiles[-1])
+        for pages in args.pages:
+            site = generate_site(workdir / f"site-{pages}", pages=pages)
+            profiles.append(workdir / f"site-{pages}.pprof")
+            profile_site(args.hugo, site, profiles[-1])
+        if not profiles:
+            print("nothing to profile", file=sys.stderr)
+            return 2
+
+        with output.open("wb") as file:
+            subprocess.run(
+                [args.go, "tool", "pprof", "-proto", *map(str, profiles)],
+                check=True,
+                stdout=file,
+            )
+
+    print(f"Wrote {output}, build with -Csetup-args=-Dpgo={output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
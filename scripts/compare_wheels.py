@@ -0,0 +1,284 @@
+"""
+Compares the performance of the Hugo binaries in two wheels, such as the
+last release and a Hugo update, and writes a pass/fail report.
+
+Both binaries build the same corpus of synthetic sites (see
+generate_site.py) in alternating order, --runs times each. The script
+compares build time, peak RSS and output size. A metric regresses if the
+candidate's median is worse than the baseline's by more than the threshold
+and, for the measured metrics, a one-sided Mann-Whitney U test finds the
+difference significant. Nothing is downloaded, so this works offline with
+locally built wheels.
+
+Usage:
+    python scripts/compare_wheels.py BASELINE.whl CANDIDATE.whl [--runs N] [--report report.md]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import statistics
+import sys
+import tempfile
+import zipfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from benchmark_render import parse_pages, run_hugo
+from generate_site import generate_site
+
+ROOT = Path(__file__).resolve().parent.parent
+LEGACY_BINARY_PATTERN = re.compile(r"hugo/binaries/hugo-\d[\d.]*-[^/]+$")
+
+
+@dataclass
+class Comparison:
+    site: str
+    metric: str
+    unit: str
+    baseline: list[float]
+    candidate: list[float]
+    threshold: float
+    p_value: float | None
+
+    @property
+    def change(self) -> float:
+        return statistics.median(self.candidate) / statistics.median(self.baseline) - 1
+
+    @property
+    def regressed(self) -> bool:
+        if self.change <= self.threshold:
+            return False
+        # Output size does not vary between runs, so any change is real.
+        return self.p_value is None or self.p_value < 0.05
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument(
+        "baseline", type=Path, help="wheel (or Hugo binary) to compare against"
+    )
+    p.add_argument("candidate", type=Path, help="wheel (or Hugo binary) to check")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument(
+        "--pages",
+        type=parse_pages,
+        default=[1000, 10000],
+        help="sizes of the synthetic sites in the corpus (default: 1000,10000)",
+    )
+    p.add_argument(
+        "--images",
+        type=float,
+        default=0.01,
+        help="share of the synthetic pages that have an image to process "
+        "(default: 0.01)",
+    )
+    p.add_argument(
+        "--site",
+        type=Path,
+        action="append",
+        default=[],
+        help="an additional local site to build, can be repeated",
+    )
+    p.add_argument("--time-threshold", type=float, default=0.10)
+    p.add_argument("--memory-threshold", type=float, default=0.10)
+    p.add_argument("--size-threshold", type=float, default=0.05)
+    p.add_argument("--workdir", type=Path, default=ROOT / "build" / "regression")
+    p.add_argument("--report", type=Path, help="also write the report to this file")
+    p.add_argument("--json", type=Path, help="also write the raw results to this file")
+    return p.parse_args()
+
+
+def extract_binary(path: Path, dest: Path) -> Path:
+    """Return the Hugo binary in the wheel at `path`, extracted into `dest`.
+
+    Paths that are not wheels are taken to be Hugo binaries already. Wheels
+    from before the Meson build named the binary hugo-<version>-<os>-<arch>.
+    """
+    if path.suffix != ".whl":
+        return path.resolve()
+    with zipfile.ZipFile(path) as wheel:
+        members = [
+            info
+            for info in wheel.infolist()
+            if info.filename.endswith(("hugo/binaries/hugo", "hugo/binaries/hugo.exe"))
+        ] or [
+            info
+            for info in wheel.infolist()
+            if LEGACY_BINARY_PATTERN.search(info.filename)
+        ]
+        if not members:
+            msg = f"{path} does not contain a Hugo binary"
+            raise FileNotFoundError(msg)
+        binary = Path(wheel.extract(members[0], dest))
+    binary.chmod(0o755)
+    return binary
+
+
+def mann_whitney_greater(baseline: list[float], candidate: list[float]) -> float:
+    """Return the p-value that `candidate` tends to be larger than `baseline`.
+
+    Uses the normal approximation of the U statistic with a tie correction,
+    which is close enough for a handful of runs to flag clear regressions.
+    """
+    n1, n2 = len(candidate), len(baseline)
+    values = sorted([(v, 0) for v in candidate] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(values)
+    ties = 0.0
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    rank_sum = sum(r for r, (_, group) in zip(ranks, values, strict=True) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def build_once(hugo: Path, site: Path) -> tuple[float, int, int]:
+    """Build `site` and return the wall time, peak RSS and output size in bytes."""
+    with tempfile.TemporaryDirectory(prefix="hugo-regression-") as tmp:
+        destination = Path(tmp, "public")
+        _, seconds, max_rss = run_hugo(
+            [
+                str(hugo),
+                "build",
+                "--source",
+                str(site),
+                "--destination",
+                str(destination),
+                "--cacheDir",
+                str(Path(tmp, "cache")),
+                "--quiet",
+            ]
+        )
+        size = sum(f.stat().st_size for f in destination.rglob("*") if f.is_file())
+    return seconds, max_rss, size
+
+
+def compare_site(
+    baseline: Path, candidate: Path, site: Path, args: argparse.Namespace
+) -> list[Comparison]:
+    results: dict[str, list[tuple[float, int, int]]] = {"baseline": [], "candidate": []}
+    # One warm-up build each, then alternate, so that drift in the machine's
+    # load affects both binaries alike.
+    build_once(baseline, site)
+    build_once(candidate, site)
+    for i in range(args.runs):
+        order = [("baseline", baseline), ("candidate", candidate)]
+        for name, hugo in order if i % 2 == 0 else reversed(order):
+            results[name].append(build_once(hugo, site))
+        print(f"  {site.name}: run {i + 1}/{args.runs}", flush=True)
+
+    metrics = [
+        ("build time", "s", 0, args.time_threshold, True),
+        ("peak RSS", "MB", 1, args.memory_threshold, True),
+        ("output size", "MB", 2, args.size_threshold, False),
+    ]
+    comparisons = []
+    for metric, unit, index, threshold, measured in metrics:
+        scale = 1 if unit == "s" else 2**20
+        base = [run[index] / scale for run in results["baseline"]]
+        cand = [run[index] / scale for run in results["candidate"]]
+        comparisons.append(
+            Comparison(
+                site=site.name,
+                metric=metric,
+                unit=unit,
+                baseline=base,
+                candidate=cand,
+                threshold=threshold,
+                p_value=mann_whitney_greater(base, cand) if measured else None,
+            )
+        )
+    return comparisons
+
+
+def render_report(
+    versions: dict[str, str], comparisons: list[Comparison], runs: int
+) -> str:
+    failed = [c for c in comparisons if c.regressed]
+    lines = [
+        f"## Performance comparison: {'FAIL' if failed else 'PASS'}",
+        "",
+        f"- Baseline: `{versions['baseline']}`",
+        f"- Candidate: `{versions['candidate']}`",
+        f"- {runs} runs per binary and site, medians shown",
+        "",
+        "| site | metric | baseline | candidate | change | threshold | p | result |",
+        "| --- | --- | ---: | ---: | ---: | ---: | ---: | --- |",
+    ]
+    for c in comparisons:
+        p_value = f"{c.p_value:.3f}" if c.p_value is not None else "n/a"
+        lines.append(
+            f"| {c.site} | {c.metric} "
+            f"| {statistics.median(c.baseline):.2f} {c.unit} "
+            f"| {statistics.median(c.candidate):.2f} {c.unit} "
+            f"| {c.change:+.1%} | {c.threshold:+.0%} | {p_value} "
+            f"| {'regression' if c.regressed else 'ok'} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    args = parse_args()
+    args.workdir = args.workdir.resolve()
+    args.workdir.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(prefix="hugo-wheels-") as tmp:
+        binaries = {
+            "baseline": extract_binary(args.baseline, Path(tmp, "baseline")),
+            "candidate": extract_binary(args.candidate, Path(tmp, "candidate")),
+        }
+        versions = {
+            name: run_hugo([str(binary), "version"])[0].strip()
+            for name, binary in binaries.items()
+        }
+        for name, version in versions.items():
+            print(f"{name}: {version}")
+
+        sites = [
+            generate_site(
+                args.workdir / f"site-{pages}",
+                pages=pages,
+                images=int(pages * args.images),
+            )
+            for pages in args.pages
+        ]
+        sites += [site.resolve() for site in args.site]
+        comparisons = []
+        for site in sites:
+            comparisons += compare_site(
+                binaries["baseline"], binaries["candidate"], site, args
+            )
+
+    report = render_report(versions, comparisons, args.runs)
+    print(f"\n{report}")
+    if args.report:
+        args.report.write_text(report)
+    if args.json:
+        data = {
+            "versions": versions,
+            "comparisons": [
+                {**asdict(c), "change": c.change, "regressed": c.regressed}
+                for c in comparisons
+            ],
+        }
+        args.json.write_text(json.dumps(data, indent=2))
+    return 1 if any(c.regressed for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
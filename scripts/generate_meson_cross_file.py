@@ -6,6 +6,7 @@ for any general cross-compiler (say, Clang, or a custom-built GCC toolchain).
 
 Usage:
     python scripts/generate_meson_cross_file.py --goos OS --goarch ARCH --output PATH.txt
+        [--arch-level LEVEL] [--extra-arch-levels LEVEL,...]
 """
 
 from __future__ import annotations
@@ -31,19 +32,35 @@ HOST_MACHINE_MAP: dict[tuple[str, str], tuple[str, str, str, str]] = {
 }
 
 
-def render(goos: str, goarch: str) -> str:
+def render(
+    goos: str,
+    goarch: str,
+    arch_level: str = "",
+    extra_arch_levels: list[str] | None = None,
+) -> str:
     key = (goos, goarch)
     if key not in HOST_MACHINE_MAP:
         sys.exit(f"This is an unsupported GOOS/GOARCH combination: {goos}/{goarch}")
 
     system, family, cpu, endian = HOST_MACHINE_MAP[key]
-    return (
+    content = (
         "[host_machine]\n"
         f"system     = '{system}'\n"
         f"cpu_family = '{family}'\n"
         f"cpu        = '{cpu}'\n"
         f"endian     = '{endian}'\n"
     )
+    # The microarchitecture levels are the project's own Meson options, which
+    # machine files can set as well.
+    options = []
+    if arch_level:
+        options.append(f"arch_level = '{arch_level}'")
+    if extra_arch_levels:
+        levels = ", ".join(f"'{level}'" for level in extra_arch_levels)
+        options.append(f"extra_arch_levels = [{levels}]")
+    if options:
+        content += "\n[project options]\n" + "".join(f"{o}\n" for o in options)
+    return content
 
 
 def main() -> int:
@@ -51,9 +68,22 @@ def main() -> int:
     p.add_argument("--goos", required=True)
     p.add_argument("--goarch", required=True)
     p.add_argument("--output", required=True, type=Path)
+    p.add_argument("--arch-level", default="", help="GOAMD64 or GOARM64 level")
+    p.add_argument(
+        "--extra-arch-levels",
+        default="",
+        help="comma-separated levels to build additional binaries for",
+    )
     args = p.parse_args()
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_text(render(args.goos, args.goarch))
+    args.output.write_text(
+        render(
+            args.goos,
+            args.goarch,
+            args.arch_level,
+            [level for level in args.extra_arch_levels.split(",") if level],
+        )
+    )
     print(f"Wrote {args.output}")
     return 0
 
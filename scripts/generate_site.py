@@ -0,0 +1,273 @@
+"""
+Generates a synthetic Hugo site of a given size, for profiling and
+benchmarking the Hugo binary on sites larger than docs/.
+
+Pages are spread over sections and tagged from fixed pools of tags and
+categories, and their bodies mix Markdown prose, headings, lists, tables,
+highlighted code blocks and shortcodes. Optionally, some pages are page
+bundles with a PNG image that the page template resizes. The bundles share a
+few distinct images through hard links, so that large sites do not take
+gigabytes of disk. Building with HUGO_PARAMS_SKIPIMAGES=true leaves the
+images unprocessed. The content is pseudo-random but fully determined by
+--seed, so runs with the same arguments produce the same site.
+
+Usage:
+    python scripts/generate_site.py DEST [--pages N] [--sections N] [--tags N] [--images N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+WORDS = (  # noqa: SIM905
+    "static site generator template content section taxonomy page render "
+    "markdown shortcode partial build output resource image asset pipeline "
+    "theme layout front matter menu archive summary feed index sitemap "
+    "translation language module cache server minify bundle fingerprint "
+    "performance memory parallel concurrency hugo python wheel binary"
+).split()
+
+CODE_SNIPPETS = {
+    "go": 'func main() {\n\tfmt.Println("hello, world")\n}',
+    "python": "def render(page):\n    return template.format(**page)",
+    "toml": 'baseURL = "https://example.org/"\ntitle = "Example"',
+}
+
+# Set this environment variable to true to build a generated site without
+# resizing its images, see the single page template.
+SKIP_IMAGES_ENV_VAR = "HUGO_PARAMS_SKIPIMAGES"
+
+# Distinct images that the page bundles link to.
+IMAGE_VARIANTS = 4
+
+CONFIG = """\
+baseURL = "https://example.org/"
+title = "Synthetic site"
+disableKinds = ["RSS"]
+
+[taxonomies]
+tag = "tags"
+category = "categories"
+
+[markup.highlight]
+noClasses = false
+"""
+
+LAYOUTS = {
+    "baseof.html": """\
+<!doctype html>
+<html lang="en">
+<head><title>{{ .Title }} | {{ site.Title }}</title></head>
+<body>
+<nav>{{ range site.Sections }}<a href="{{ .RelPermalink }}">{{ .Title }}</a> {{ end }}</nav>
+<main>{{ block "main" . }}{{ end }}</main>
+</body>
+</html>
+""",
+    "single.html": """\
+{{ define "main" }}
+<article>
+<h1>{{ .Title }}</h1>
+<p>{{ .Date.Format "2006-01-02" }} · {{ .ReadingTime }} min · {{ .WordCount }} words</p>
+{{ if not site.Params.skipImages }}{{ with .Resources.GetMatch "*.png" }}
+{{ with .Resize "160x webp" }}<img src="{{ .RelPermalink }}" width="{{ .Width }}" height="{{ .Height }}">{{ end }}
+{{ end }}{{ end }}
+{{ .TableOfContents }}
+{{ .Content }}
+<ul>{{ range .GetTerms "tags" }}<li><a href="{{ .RelPermalink }}">{{ .LinkTitle }}</a></li>{{ end }}</ul>
+<h2>Related</h2>
+<ul>{{ range site.RegularPages.Related . | first 5 }}<li><a href="{{ .RelPermalink }}">{{ .Title }}</a></li>{{ end }}</ul>
+</article>
+{{ end }}
+""",
+    "list.html": """\
+{{ define "main" }}
+<h1>{{ .Title }}</h1>
+{{ range (.Paginate .Pages).Pages }}
+<article><h2><a href="{{ .RelPermalink }}">{{ .Title }}</a></h2>{{ .Summary }}</article>
+{{ end }}
+{{ partial "pagination.html" . }}
+{{ end }}
+""",
+    "_partials/pagination.html": """\
+{{ with .Paginator }}{{ if gt .TotalPages 1 }}
+<nav>{{ with .Prev }}<a href="{{ .URL }}">prev</a>{{ end }} {{ .PageNumber }}/{{ .TotalPages }} {{ with .Next }}<a href="{{ .URL }}">next</a>{{ end }}</nav>
+{{ end }}{{ end }}
+""",
+    "_shortcodes/note.html": """\
+<aside class="note note-{{ .Get "kind" | default "info" }}">{{ .Inner | markdownify }}</aside>
+""",
+}
+
+
+def _png(width: int, height: int, variant: int) -> bytes:
+    """Return an RGB PNG with a gradient and a pattern that depends on `variant`."""
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)  # no filter
+        for x in range(width):
+            rows += bytes(
+                (x * 255 // width, y * 255 // height, (x * y + variant * 37) & 0xFF)
+            )
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        crc = zlib.crc32(kind + data)
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(bytes(rows)))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(6, 16))
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(_sentence(rng) for _ in range(rng.randint(3, 7)))
+
+
+def _body(rng: random.Random, paragraphs: int, shortcodes: bool) -> str:
+    blocks = []
+    for i in range(paragraphs):
+        if i % 3 == 0:
+            blocks.append(f"## {_sentence(rng)[:-1]}")
+        blocks.append(_paragraph(rng))
+        if i % 4 == 1:
+            blocks.append("\n".join(f"- {_sentence(rng)}" for _ in range(4)))
+        if i % 5 == 2:
+            language, code = rng.choice(sorted(CODE_SNIPPETS.items()))
+            blocks.append(f"```{language}\n{code}\n```")
+        if i % 6 == 3:
+            rows = "\n".join(
+                f"| {rng.choice(WORDS)} | {rng.randint(0, 999)} |" for _ in range(5)
+            )
+            blocks.append(f"| name | value |\n| --- | ---: |\n{rows}")
+        if shortcodes and i % 4 == 2:
+            blocks.append(
+                f'{{{{< note kind="tip" >}}}}\n{_sentence(rng)}\n{{{{< /note >}}}}'
+            )
+    return "\n\n".join(blocks)
+
+
+def generate_site(
+    dest: Path,
+    pages: int = 1000,
+    sections: int = 10,
+    tags: int = 100,
+    categories: int = 10,
+    paragraphs: int = 8,
+    shortcodes: bool = True,
+    images: int = 0,
+    image_size: int = 256,
+    seed: int = 0,
+) -> Path:
+    """Write a synthetic site with `pages` regular pages to `dest`.
+
+    The first `images` pages are page bundles with an `image_size` square
+    PNG, hard linked where the file system allows it. Any existing content
+    in `dest` is replaced. Returns `dest`.
+    """
+    rng = random.Random(seed)
+    shutil.rmtree(dest, ignore_errors=True)
+    dest.mkdir(parents=True)
+    (dest / "hugo.toml").write_text(CONFIG)
+    for name, layout in LAYOUTS.items():
+        path = dest / "layouts" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(layout)
+
+    tag_pool = [f"tag-{i}" for i in range(tags)]
+    category_pool = [f"category-{i}" for i in range(categories)]
+    content = dest / "content"
+    # A few distinct images are enough, since Hugo processes every page's
+    # copy separately. They are kept outside of the directories Hugo reads.
+    pngs = []
+    for variant in range(IMAGE_VARIANTS if images else 0):
+        png = dest / "images" / f"image-{variant}.png"
+        png.parent.mkdir(exist_ok=True)
+        png.write_bytes(_png(image_size, image_size, variant))
+        pngs.append(png)
+    for section in range(sections):
+        section_dir = content / f"section-{section}"
+        section_dir.mkdir(parents=True)
+        (section_dir / "_index.md").write_text(
+            f'---\ntitle: "Section {section}"\n---\n\n{_paragraph(rng)}\n'
+        )
+
+    for page in range(pages):
+        page_tags = rng.sample(tag_pool, k=min(len(tag_pool), rng.randint(1, 5)))
+        page_categories = rng.sample(category_pool, k=min(len(category_pool), 1))
+        front_matter = "\n".join(
+            [
+                "---",
+                f'title: "{_sentence(rng)[:-1]} {page}"',
+                f"date: 2024-{page % 12 + 1:02d}-{page % 28 + 1:02d}T00:00:00Z",
+                f"tags: [{', '.join(page_tags)}]",
+                f"categories: [{', '.join(page_categories)}]",
+                f"weight: {page}",
+                "---",
+            ]
+        )
+        text = f"{front_matter}\n\n{_body(rng, paragraphs, shortcodes)}\n"
+        section_dir = content / f"section-{page % sections}"
+        if page < images:
+            bundle = section_dir / f"page-{page}"
+            bundle.mkdir()
+            (bundle / "index.md").write_text(text)
+            try:
+                os.link(pngs[page % len(pngs)], bundle / "image.png")
+            except OSError:
+                shutil.copyfile(pngs[page % len(pngs)], bundle / "image.png")
+        else:
+            (section_dir / f"page-{page}.md").write_text(text)
+    return dest
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    p.add_argument("dest", type=Path)
+    p.add_argument("--pages", type=int, default=1000)
+    p.add_argument("--sections", type=int, default=10)
+    p.add_argument("--tags", type=int, default=100)
+    p.add_argument("--categories", type=int, default=10)
+    p.add_argument("--paragraphs", type=int, default=8, help="paragraphs per page")
+    p.add_argument("--no-shortcodes", action="store_true")
+    p.add_argument("--images", type=int, default=0, help="pages with an image")
+    p.add_argument("--image-size", type=int, default=256, help="image width and height")
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    generate_site(
+        args.dest,
+        pages=args.pages,
+        sections=args.sections,
+        tags=args.tags,
+        categories=args.categories,
+        paragraphs=args.paragraphs,
+        shortcodes=not args.no_shortcodes,
+        images=args.images,
+        image_size=args.image_size,
+        seed=args.seed,
+    )
+    print(f"Generated {args.pages} pages in {args.dest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
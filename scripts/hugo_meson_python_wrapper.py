@@ -14,106 +14,154 @@ does nothing in that case and just passes through to meson-python. Cross
 builds with an unsupported (host_machine.system, host_machine.cpu_family)
 tuple will likely produce an incorrectly tagged wheel that will need to
 be manually renamed.
+
+The cross file, setup-args and host are resolved into a build plan once
+per session (see build_plan.py) and shared by every hook and by
+build_hugo.py, instead of each of them re-deriving the same facts.
 """
 
 from __future__ import annotations
 
-import configparser
 import os
 import re
+import tempfile
+import zipfile
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
 import mesonpy
-from piwheels_go_toolchain import GO_VERSION, is_32bit_arm_linux
-
-# (host_machine.system, host_machine.cpu_family) -> _PYTHON_HOST_PLATFORM
-PLATFORM_TAGS_MAP: dict[tuple[str, str], str] = {
-    ("linux", "x86_64"): "linux_x86_64",
-    ("linux", "aarch64"): "linux_aarch64",
-    ("linux", "arm"): "linux_armv7l",
-    ("linux", "x86"): "linux_i686",
-    ("linux", "ppc64"): "linux_ppc64le",
-    ("linux", "s390x"): "linux_s390x",
-    ("linux", "riscv64"): "linux_riscv64",
-    ("windows", "x86_64"): "win_amd64",
-    ("windows", "aarch64"): "win_arm64",
-    ("windows", "x86"): "win32",
-    (
-        "darwin",
-        "x86_64",
-    ): "macosx_10_13_x86_64",  # TODO: figure out what to do about MACOSX_DEPLOYMENT_TARGET
-    (
-        "darwin",
-        "aarch64",
-    ): "macosx_11_0_arm64",  # TODO: figure out what to do about MACOSX_DEPLOYMENT_TARGET
-}
-
-
-def _flatten(value: Any) -> list[str]:
-    if value is None:
-        return []
-    if isinstance(value, str):
-        return [value]
-    return list(value)
-
-
-def _strip_quotes(string: str) -> str:
-    return string.strip().strip("'\"")
-
-
-def _parse_cross_file(config_settings: dict[str, Any] | None) -> tuple[str, str] | None:
-    """Return (system, cpu_family) from a Meson cross file in config_settings, or None."""
-    if not config_settings:
-        return None
-    setup_args = _flatten(config_settings.get("setup-args"))
-    cross_file: Path | None = None
-    for arg in setup_args:
-        m = re.match(r"--cross-file[= ](.+)$", arg)
-        if m:
-            cross_file = Path(m.group(1))
-            break
-    if cross_file is None or not cross_file.exists():
-        return None
-
-    cfg = configparser.ConfigParser()
-    cfg.read(cross_file)
-    if "host_machine" not in cfg:
-        return None
-
-    system = _strip_quotes(cfg["host_machine"].get("system", ""))
-    family = _strip_quotes(cfg["host_machine"].get("cpu_family", ""))
-    return (system, family) if system and family else None
-
-
-def _host_platform_tag(config_settings: dict[str, Any] | None) -> str | None:
-    """Return the target wheel platform tag from a Meson cross file, if any."""
-    host = _parse_cross_file(config_settings)
-    return None if host is None else PLATFORM_TAGS_MAP.get(host)
-
-
-def _needs_zig(config_settings: dict[str, Any] | None) -> bool:
-    """Return True if the Zig compiler is needed for this build.
-
-    We do `auto_use_zig = meson.is_cross_build() and host_sys != 'darwin'`.
-    It maps here. An explicit -Duse_zig=true/false in setup-args overrides
-    the auto logic.
+from build_plan import (
+    PLAN_ENV_VAR,
+    PLAN_FILE_NAME,
+    BuildPlan,
+    _flatten,
+    resolve,
+    zip_compression,
+)
+from piwheels_go_toolchain import GO_VERSION
+
+# Wheel members that the binary_compression option applies to
+BINARY_MEMBER_PATTERN = re.compile(r"(^|/)hugo/binaries/[^/]+$")
+
+# Frontends may call several hooks in one process, so plans are also kept
+# in memory, keyed by the config_settings they were resolved from.
+_PLANS: dict[str, BuildPlan] = {}
+
+
+def _plan(config_settings: dict[str, Any] | None) -> BuildPlan:
+    """Return the build plan for config_settings, resolving it at most once."""
+    key = repr(sorted((config_settings or {}).items()))
+    if key not in _PLANS:
+        _PLANS[key] = resolve(config_settings)
+    return _PLANS[key]
+
+
+@contextmanager
+def _handed_to_build(
+    plan: BuildPlan, config_settings: dict[str, Any] | None
+) -> Iterator[None]:
+    """Point build_hugo.py at the plan while meson-python builds.
+
+    The plan stored in the build directory is used if there is one, and a
+    temporary copy otherwise.
+    """
+    build_dir = (config_settings or {}).get("build-dir")
+    stored = Path(build_dir, PLAN_FILE_NAME) if build_dir else None
+    if stored is not None and BuildPlan.read(stored) == plan:
+        path, temporary = stored.resolve(), False
+    else:
+        fd, name = tempfile.mkstemp(prefix="hugo-build-plan-", suffix=".json")
+        os.close(fd)
+        path, temporary = Path(name), True
+        plan.write(path)
+    os.environ[PLAN_ENV_VAR] = str(path)
+    try:
+        yield
+    finally:
+        os.environ.pop(PLAN_ENV_VAR, None)
+        if temporary:
+            path.unlink(missing_ok=True)
+
+
+def _without_native_launcher(
+    config_settings: dict[str, Any] | None,
+) -> dict[str, Any] | None:
+    """Drop -Dnative_launcher from setup-args.
+
+    Editable installs have no fixed location for the binary, so they always
+    keep the Python console script.
+    """
+    if not _plan(config_settings).native_launcher:
+        return config_settings
+    setup_args = [
+        arg
+        for arg in _flatten(config_settings.get("setup-args"))
+        if not arg.startswith("-Dnative_launcher=")
+    ]
+    return {**config_settings, "setup-args": setup_args}
+
+
+def _drop_hugo_console_script() -> None:
+    """Leave the hugo console script out of entry_points.txt.
+
+    The native launcher is installed as `hugo` in the scripts directory, and
+    installers would otherwise write the console script over it or refuse to
+    install the wheel. TODO: drop this hack/use of private API if meson-python
+    someday lets a build leave out a console script.
+    """
+    entrypoints_txt = mesonpy._WheelBuilder.entrypoints_txt.fget
+
+    def _entrypoints_txt(self: mesonpy._WheelBuilder) -> bytes:
+        scripts = self._metadata.scripts
+        self._metadata.scripts = {k: v for k, v in scripts.items() if k != "hugo"}
+        try:
+            return entrypoints_txt(self)
+        finally:
+            self._metadata.scripts = scripts
+
+    mesonpy._WheelBuilder.entrypoints_txt = property(_entrypoints_txt)
+
+
+def _compress_binaries(compression: str) -> None:
+    """Write the Hugo binaries into the wheel with the given compression.
+
+    meson-python writes every member with the same zipfile compression, so
+    this swaps the archive's settings for the duration of the binaries'
+    writes. The binaries make up nearly all of the wheel, so unzipping them
+    dominates install times.
     """
-    host = _parse_cross_file(config_settings)
-    if host is None:
-        return False
-    setup_args = _flatten(config_settings.get("setup-args") if config_settings else [])
-    for arg in setup_args:
-        m = re.match(r"-Duse_zig=(true|false)$", arg)
-        if m:
-            return m.group(1) == "true"
-    system, _ = host
-    return system != "darwin"
-
-
-def _maybe_set_host_platform(config_settings: dict[str, Any] | None) -> None:
-    """If config_settings contains a Meson cross file, force meson-python's wheel tag."""
-    tag = _host_platform_tag(config_settings)
+    if compression == "deflate":
+        return
+    compress_type, level = zip_compression(compression)
+
+    writestr = mesonpy._wheelfile.WheelFileWriter.writestr
+
+    def _writestr(
+        self: mesonpy._wheelfile.WheelFileWriter,
+        zinfo_or_arcname: str | zipfile.ZipInfo,
+        data: bytes,
+    ) -> None:
+        name = getattr(zinfo_or_arcname, "filename", zinfo_or_arcname)
+        if not BINARY_MEMBER_PATTERN.search(name):
+            writestr(self, zinfo_or_arcname, data)
+            return
+        archive = self.archive
+        saved = archive.compression, archive.compresslevel
+        archive.compression, archive.compresslevel = compress_type, level
+        try:
+            writestr(self, zinfo_or_arcname, data)
+        finally:
+            archive.compression, archive.compresslevel = saved
+
+    # TODO: drop this hack/use of private API
+    mesonpy._wheelfile.WheelFileWriter.writestr = _writestr
+
+
+def _maybe_set_host_platform(plan: BuildPlan) -> None:
+    """If the build has a cross file, force meson-python's wheel tag."""
+    tag = plan.platform_tag
     if tag is None:
         return
 
@@ -145,9 +193,14 @@ def build_wheel(
     config_settings: dict[str, Any] | None = None,
     metadata_directory: str | None = None,
 ) -> str:
-    _maybe_set_host_platform(config_settings)
+    plan = _plan(config_settings)
+    _maybe_set_host_platform(plan)
     _force_py3_none_tag()
-    return mesonpy.build_wheel(wheel_directory, config_settings, metadata_directory)
+    if plan.native_launcher:
+        _drop_hugo_console_script()
+    _compress_binaries(plan.binary_compression)
+    with _handed_to_build(plan, config_settings):
+        return mesonpy.build_wheel(wheel_directory, config_settings, metadata_directory)
 
 
 def build_editable(
@@ -155,9 +208,14 @@ def build_editable(
     config_settings: dict[str, Any] | None = None,
     metadata_directory: str | None = None,
 ) -> str:
-    _maybe_set_host_platform(config_settings)
+    config_settings = _without_native_launcher(config_settings)
+    plan = _plan(config_settings)
+    _maybe_set_host_platform(plan)
     _force_py3_none_tag()
-    return mesonpy.build_editable(wheel_directory, config_settings, metadata_directory)
+    with _handed_to_build(plan, config_settings):
+        return mesonpy.build_editable(
+            wheel_directory, config_settings, metadata_directory
+        )
 
 
 def build_sdist(
@@ -170,12 +228,13 @@ def get_requires_for_build_wheel(
     config_settings: dict[str, Any] | None = None,
 ) -> list[str]:
     reqs = list(mesonpy.get_requires_for_build_wheel(config_settings))
+    plan = _plan(config_settings)
     # It is impossible for go-bin to ship armv6l/armv7l wheels as it
     # just bundles the downloaded Go toolchain, so we need to download
     # it ourselves for piwheels instead of relying on go-bin.
-    if not is_32bit_arm_linux():
+    if not plan.download_go:
         reqs.append(f"go-bin=={GO_VERSION}")
-    if _needs_zig(config_settings):
+    if plan.use_zig:
         reqs.append("ziglang==0.16.0")
     return reqs
 
@@ -184,7 +243,7 @@ def get_requires_for_build_editable(
     config_settings: dict[str, Any] | None = None,
 ) -> list[str]:
     reqs = list(mesonpy.get_requires_for_build_editable(config_settings))
-    if not is_32bit_arm_linux():
+    if not _plan(config_settings).download_go:
         reqs.append(f"go-bin=={GO_VERSION}")
     return reqs
 
@@ -11,10 +11,12 @@ and download the official go.dev toolchain archive directly instead.
 from __future__ import annotations
 
 import hashlib
+import os
 import platform
 import shutil
 import sys
 import tarfile
+import urllib.error
 import urllib.request
 from pathlib import Path
 
@@ -23,23 +25,86 @@ GO_VERSION = "1.26.4"
 GO_LINUX_ARM_SHA256 = "8db458e995f18a9427a745cefe7a3323962fa2548c4715148963311f300d3b1a"
 
 GO_LINUX_ARM_FILENAME = f"go{GO_VERSION}.linux-armv6l.tar.gz"
-GO_LINUX_ARM_URL = f"https://go.dev/dl/{GO_LINUX_ARM_FILENAME}"
+GO_DOWNLOAD_URL = "https://go.dev/dl/"
+
+# Set to a base URL (https://, file://) or a local directory that contains
+# GO_LINUX_ARM_FILENAME, to download the toolchain from there instead.
+GO_MIRROR_ENV_VAR = "PYHUGO_GO_MIRROR"
+
+# Written into the extracted GOROOT, so that later builds can reuse it
+TOOLCHAIN_STAMP = ".pyhugo-toolchain"
+
+CHUNK_SIZE = 1 << 20
 
 
 def is_32bit_arm_linux() -> bool:
     return sys.platform == "linux" and platform.machine() in ("armv6l", "armv7l")
 
 
+def toolchain_url() -> str:
+    base = os.environ.get(GO_MIRROR_ENV_VAR) or GO_DOWNLOAD_URL
+    if "://" not in base:
+        base = Path(base).resolve().as_uri()
+    return f"{base.rstrip('/')}/{GO_LINUX_ARM_FILENAME}"
+
+
+def download(url: str, destination: Path) -> str:
+    """Stream `url` to `destination` and return the file's SHA-256.
+
+    The file is hashed in chunks as it is written. Data is first written to
+    a `.part` file, and if one is left over from an interrupted download, it
+    is resumed with an HTTP range request where the server supports it.
+    """
+    partial = destination.with_name(destination.name + ".part")
+    digest = hashlib.sha256()
+    offset = 0
+    if partial.is_file():
+        with partial.open("rb") as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                offset += len(chunk)
+
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        with urllib.request.urlopen(request) as response:
+            if offset and getattr(response, "status", None) != 206:
+                # The server (or a file:// URL) sent the whole file instead
+                digest = hashlib.sha256()
+                offset = 0
+            with partial.open("ab" if offset else "wb") as file:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    file.write(chunk)
+    except urllib.error.HTTPError as err:
+        # 416 means that the partial file already holds the whole archive
+        if not (offset and err.code == 416):
+            raise
+
+    partial.replace(destination)
+    return digest.hexdigest()
+
+
 def download_go_toolchain(dest_dir: Path) -> tuple[str, str]:
-    """Download and extract the official Go toolchain for 32-bit ARM Linux on piwheels."""
+    """Download and extract the official Go toolchain for 32-bit ARM Linux on piwheels.
+
+    A toolchain extracted by an earlier build into the same directory is
+    reused if it was extracted from the same version and checksum.
+    """
     goroot = dest_dir / "go"
+    go_binary = goroot / "bin" / "go"
+    stamp = goroot / TOOLCHAIN_STAMP
+    expected_stamp = f"{GO_VERSION} {GO_LINUX_ARM_SHA256}"
+    if go_binary.is_file() and stamp.is_file() and stamp.read_text() == expected_stamp:
+        return str(go_binary), str(goroot)
+
     shutil.rmtree(goroot, ignore_errors=True)
 
     archive_path = dest_dir / GO_LINUX_ARM_FILENAME
-    urllib.request.urlretrieve(GO_LINUX_ARM_URL, archive_path)
-
-    digest = hashlib.sha256(archive_path.read_bytes()).hexdigest()
+    digest = download(toolchain_url(), archive_path)
     if digest != GO_LINUX_ARM_SHA256:
+        archive_path.unlink()
         msg = (
             f"checksum mismatch for {GO_LINUX_ARM_FILENAME}: "
             f"expected {GO_LINUX_ARM_SHA256}, got {digest}"
@@ -52,5 +117,6 @@ def download_go_toolchain(dest_dir: Path) -> tuple[str, str]:
         else:
             tar.extractall(dest_dir)
     archive_path.unlink()
+    stamp.write_text(expected_stamp)
 
-    return str(goroot / "bin" / "go"), str(goroot)
+    return str(go_binary), str(goroot)
@@ -3,40 +3,124 @@ Hugo submodule, which is not needed for users building from sdist and would
 just artificially inflate the distributions' size. This is invoked by the
 `meson dist` command.
 
-TODO: figure out a better, more declarative way to do this, because I can't
-find a meson-python sdist include/exclude mechanism. There's only one for
-wheels right now.
+meson-python has no sdist include/exclude mechanism (only one for wheels),
+and `meson dist` includes everything tracked by git, so the exclusions are
+declared as rules here instead. The dist root is walked once with
+os.scandir, anything a rule matches is removed as soon as it is seen (a
+directory without descending into it first), and the bytes removed are
+reported per rule.
 """
 
 from __future__ import annotations
 
+import fnmatch
 import os
-import shutil
 import sys
-from pathlib import Path
-
-EXCLUDED_DIRS = (
-    "hugo-src/docs",
-    "hugo-src/testscripts",
-    "docs",
-    "src/hugo/binaries",
-    "hugo_cache",
-    "build",
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Entries to remove from the sdist.
+
+    An entry matches if it is under `within` (a relative POSIX path, or
+    anywhere if empty) and matches any of the criteria: its relative path
+    is one of `paths`, its name is one of `dir_names` (directories only),
+    its relative path matches one of the fnmatch `globs`, or it is a file
+    with one of the `extensions`. If `min_size` is set, matching files are
+    only removed if they are at least that many bytes.
+    """
+
+    name: str
+    within: str = ""
+    paths: tuple[str, ...] = ()
+    dir_names: tuple[str, ...] = ()
+    globs: tuple[str, ...] = ()
+    extensions: tuple[str, ...] = ()
+    min_size: int | None = None
+
+    def matches(self, rel: str, entry: os.DirEntry[str], is_dir: bool) -> bool:
+        if self.within and not rel.startswith(f"{self.within}/"):
+            return False
+        matched = (
+            rel in self.paths
+            or (is_dir and entry.name in self.dir_names)
+            or any(fnmatch.fnmatchcase(rel, glob) for glob in self.globs)
+            or (
+                not is_dir
+                and bool(self.extensions)
+                and entry.name.endswith(self.extensions)
+            )
+        )
+        # Checked last, since it is the only criterion that needs a stat().
+        if matched and not is_dir and self.min_size is not None:
+            return entry.stat(follow_symlinks=False).st_size >= self.min_size
+        return matched
+
+
+RULES = (
+    Rule(
+        "build artifacts",
+        paths=("src/hugo/binaries", "hugo_cache", "build"),
+    ),
+    Rule("documentation", paths=("docs", "hugo-src/docs")),
+    Rule("Hugo's integration tests", paths=("hugo-src/testscripts",)),
+    Rule("Hugo's test data", within="hugo-src", dir_names=("testdata",)),
+    # `go build` and `go install` never compile _test.go files.
+    Rule("Hugo's Go tests", within="hugo-src", globs=("*_test.go",)),
+    Rule("Hugo's CI configuration", paths=("hugo-src/.github",)),
 )
 
 
+def _remove_tree(path: str) -> int:
+    """Delete the directory at `path` and return the bytes its files took."""
+    removed = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                removed += _remove_tree(entry.path)
+            else:
+                removed += entry.stat(follow_symlinks=False).st_size
+                os.unlink(entry.path)  # noqa: PTH108
+    os.rmdir(path)  # noqa: PTH106
+    return removed
+
+
+def prune(root: str, rules: tuple[Rule, ...] = RULES) -> dict[str, tuple[int, int]]:
+    """Remove everything under `root` that a rule matches.
+
+    Returns the number of entries and bytes removed, by rule name.
+    """
+    removed = {rule.name: (0, 0) for rule in rules}
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as entries:  # noqa: PTH118
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                is_dir = entry.is_dir(follow_symlinks=False)
+                rule = next((r for r in rules if r.matches(rel, entry, is_dir)), None)
+                if rule is None:
+                    if is_dir:
+                        stack.append(rel)
+                    continue
+                if is_dir:
+                    size = _remove_tree(entry.path)
+                else:
+                    size = entry.stat(follow_symlinks=False).st_size
+                    os.unlink(entry.path)  # noqa: PTH108
+                count, total = removed[rule.name]
+                removed[rule.name] = (count + 1, total + size)
+    return removed
+
+
 def main() -> int:
-    root = Path(os.environ["MESON_DIST_ROOT"])
-    for rel in EXCLUDED_DIRS:
-        target = root / rel
-        if target.exists():
-            shutil.rmtree(target)
-            print(f"pruned {rel}")
-
-    for testdata in root.glob("hugo-src/**/testdata"):
-        if testdata.is_dir():
-            shutil.rmtree(testdata)
-            print(f"pruned {testdata.relative_to(root)}")
+    root = os.environ["MESON_DIST_ROOT"]
+    removed = prune(root)
+    for name, (count, size) in removed.items():
+        print(f"pruned {name}: {count} entries, {size / 2**20:.1f} MiB")
+    total = sum(size for _, size in removed.values())
+    print(f"pruned {total / 2**20:.1f} MiB in total")
     return 0
 
 
@@ -0,0 +1,27 @@
+"""
+Copyright (c) 2023 Agriya Khetarpal. All rights reserved.
+
+hugo: Binaries for the Hugo static site generator, installable with pip
+"""
+
+from __future__ import annotations
+
+# typing itself is slow to import, so it is not used for TYPE_CHECKING here
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+    from hugo.api import Hugo, executable, run
+
+__all__ = ["Hugo", "executable", "run"]
+
+
+# The console script imports this package before hugo.cli, so the Python
+# API is only imported when it is first used.
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        from hugo import api
+
+        return getattr(api, name)
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
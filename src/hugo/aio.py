@@ -0,0 +1,171 @@
+"""
+Copyright (c) 2023 Agriya Khetarpal. All rights reserved.
+
+hugo: Binaries for the Hugo static site generator, installable with pip
+
+An asyncio-based runner for the bundled Hugo binary, mainly for building
+many sites concurrently from one Python process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TextIO
+
+from hugo.api import _merged_env, executable
+
+
+@dataclass(frozen=True)
+class Result:
+    """The outcome of one Hugo invocation."""
+
+    args: list[str]
+    returncode: int
+    duration: float
+    stdout: str
+    stderr: str
+    source: Path | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+def default_concurrency() -> int:
+    return os.cpu_count() or 1
+
+
+async def _pump(
+    stream: asyncio.StreamReader,
+    sink: TextIO,
+    prefix: str | None,
+    lines: list[str],
+) -> None:
+    async for raw in stream:
+        line = raw.decode(errors="replace")
+        lines.append(line)
+        if prefix is not None:
+            sink.write(
+                f"{prefix}{line}" if line.endswith("\n") else f"{prefix}{line}\n"
+            )
+            sink.flush()
+
+
+async def run(
+    *args: str | os.PathLike[str],
+    hugo: str | os.PathLike[str] | None = None,
+    cwd: str | os.PathLike[str] | None = None,
+    env: Mapping[str, str] | None = None,
+    prefix: str | None = None,
+    timeout: float | None = None,
+) -> Result:
+    """Run Hugo with `args` and wait for it to finish.
+
+    stdout and stderr are always captured. When `prefix` is given, each
+    line is also written to this process's stdout or stderr behind it. On
+    timeout or cancellation Hugo is killed and the exception propagates.
+    """
+    argv = [os.fspath(hugo if hugo is not None else executable())]
+    argv += [os.fspath(arg) for arg in args]
+    stdout: list[str] = []
+    stderr: list[str] = []
+
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *argv,
+        cwd=cwd,
+        env=_merged_env(env),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                _pump(process.stdout, sys.stdout, prefix, stdout),
+                _pump(process.stderr, sys.stderr, prefix, stderr),
+                process.wait(),
+            ),
+            timeout,
+        )
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    duration = time.perf_counter() - start
+
+    return Result(
+        args=argv,
+        returncode=process.returncode,
+        duration=duration,
+        stdout="".join(stdout),
+        stderr="".join(stderr),
+    )
+
+
+async def build_site(
+    source: str | os.PathLike[str],
+    *args: str | os.PathLike[str],
+    hugo: str | os.PathLike[str] | None = None,
+    env: Mapping[str, str] | None = None,
+    prefix: str | None = None,
+    timeout: float | None = None,
+) -> Result:
+    """Build the site at `source`, passing any extra `args` to Hugo."""
+    source = Path(source)
+    result = await run(
+        "--source",
+        source,
+        *args,
+        hugo=hugo,
+        env=env,
+        prefix=prefix,
+        timeout=timeout,
+    )
+    return replace(result, source=source)
+
+
+async def build_sites(
+    sources: Iterable[str | os.PathLike[str]],
+    *args: str | os.PathLike[str],
+    concurrency: int | None = None,
+    env: Mapping[str, str] | None = None,
+    stream: bool = True,
+    timeout: float | None = None,
+) -> list[Result]:
+    """Build several sites concurrently and return their results in order.
+
+    At most `concurrency` Hugo processes run at once, defaulting to the
+    number of CPUs. With `stream`, each site's output is echoed behind a
+    `[<source>] ` prefix. A failing build does not stop the others, but
+    an exception (such as a timeout) cancels the remaining builds.
+    """
+    hugo = executable()
+    semaphore = asyncio.Semaphore(concurrency or default_concurrency())
+
+    async def _build(source: str | os.PathLike[str]) -> Result:
+        async with semaphore:
+            return await build_site(
+                source,
+                *args,
+                hugo=hugo,
+                env=env,
+                prefix=f"[{os.fspath(source)}] " if stream else None,
+                timeout=timeout,
+            )
+
+    tasks = [asyncio.ensure_future(_build(source)) for source in sources]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,120 @@
+"""
+Copyright (c) 2023 Agriya Khetarpal. All rights reserved.
+
+hugo: Binaries for the Hugo static site generator, installable with pip
+
+A small Python API that runs the bundled Hugo binary as a subprocess, for
+callers that would otherwise spawn a Python interpreter for the `hugo`
+console script.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from collections.abc import Mapping
+from pathlib import Path
+from typing import IO, Any
+
+from hugo.cli import _hugo_executable
+
+_File = int | IO[Any] | None
+
+
+def executable() -> Path:
+    """Return the path to the bundled Hugo binary."""
+    with _hugo_executable() as hugo_executable:
+        return Path(hugo_executable)
+
+
+def _merged_env(env: Mapping[str, str] | None) -> dict[str, str] | None:
+    if env is None:
+        return None
+    return {**os.environ, **env}
+
+
+class Hugo:
+    """Runs the bundled Hugo binary with a fixed working directory and environment.
+
+    `env` entries are added on top of `os.environ` rather than replacing it.
+    The binary is resolved once, on first use.
+    """
+
+    def __init__(
+        self,
+        executable: str | os.PathLike[str] | None = None,
+        *,
+        cwd: str | os.PathLike[str] | None = None,
+        env: Mapping[str, str] | None = None,
+    ) -> None:
+        self._executable = None if executable is None else Path(executable)
+        self.cwd = cwd
+        self.env = dict(env) if env is not None else None
+
+    @property
+    def executable(self) -> Path:
+        if self._executable is None:
+            self._executable = executable()
+        return self._executable
+
+    def run(
+        self,
+        *args: str | os.PathLike[str],
+        cwd: str | os.PathLike[str] | None = None,
+        env: Mapping[str, str] | None = None,
+        capture_output: bool = False,
+        stdout: _File = None,
+        stderr: _File = None,
+        text: bool = True,
+        timeout: float | None = None,
+        check: bool = False,
+    ) -> subprocess.CompletedProcess[Any]:
+        """Run Hugo with `args` and wait for it to finish.
+
+        Output is streamed to this process's stdout and stderr unless
+        `capture_output` is true or `stdout`/`stderr` are given. A timeout
+        kills Hugo and raises `subprocess.TimeoutExpired`, and `check`
+        raises `subprocess.CalledProcessError` on a non-zero exit code.
+        """
+        merged = self.env if env is None else {**(self.env or {}), **env}
+        if capture_output:
+            stdout = stderr = subprocess.PIPE
+        return subprocess.run(
+            [os.fspath(self.executable), *map(os.fspath, args)],
+            cwd=self.cwd if cwd is None else cwd,
+            env=_merged_env(merged),
+            stdout=stdout,
+            stderr=stderr,
+            text=text,
+            timeout=timeout,
+            check=check,
+        )
+
+    def version(self) -> str:
+        """Return the output of `hugo version`."""
+        return self.run("version", capture_output=True, check=True).stdout.strip()
+
+
+def run(
+    *args: str | os.PathLike[str],
+    cwd: str | os.PathLike[str] | None = None,
+    env: Mapping[str, str] | None = None,
+    capture_output: bool = False,
+    stdout: _File = None,
+    stderr: _File = None,
+    text: bool = True,
+    timeout: float | None = None,
+    check: bool = False,
+) -> subprocess.CompletedProcess[Any]:
+    """Run the bundled Hugo binary with `args`. See `Hugo.run`."""
+    return Hugo().run(
+        *args,
+        cwd=cwd,
+        env=env,
+        capture_output=capture_output,
+        stdout=stdout,
+        stderr=stderr,
+        text=text,
+        timeout=timeout,
+        check=check,
+    )
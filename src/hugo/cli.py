@@ -6,76 +6,311 @@ hugo: Binaries for the Hugo static site generator, installable with pip
 
 from __future__ import annotations
 
-import json
 import os
 import sys
-from contextlib import nullcontext
-from pathlib import Path, PurePosixPath
 from sys import platform as sysplatform
 
-from hugo._version import HUGO_VERSION
+# Only os and sys are imported up front, because every `hugo` call imports
+# this module. json, pathlib and contextlib (and typing, which imports the
+# latter) are only needed on the editable-install path or by the Python API,
+# so they are imported where they are used. `nox -s importtime` checks that
+# this stays the case.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import subprocess
+    from contextlib import nullcontext
+    from pathlib import Path
 
 HUGO_EXECUTABLE = "hugo.exe" if sysplatform == "win32" else "hugo"
-HUGO_BINARY_PATH = Path("binaries", HUGO_EXECUTABLE)
 
+# Editable installs rebuild on import, but the Hugo binary's target does not
+# depend on hugo-src, so updating the submodule does not rebuild it. Set
+# PYHUGO_REBUILD=1 to force that.
+REBUILD_ENV_VAR = "PYHUGO_REBUILD"
+
+# Set PYHUGO_NO_BANNER=1 to silence the "Running Hugo ..." line entirely.
+BANNER_ENV_VAR = "PYHUGO_NO_BANNER"
+
+# Set PYHUGO_SUPERVISE=1 to run Hugo as a child process instead of replacing
+# the Python process with os.execv. This is always the case on Windows.
+SUPERVISE_ENV_VAR = "PYHUGO_SUPERVISE"
+
+# Set PYHUGO_STATS=1 to record the wall time, CPU time and peak memory of
+# every run in a local log, which `python -m hugo.stats` summarizes. This
+# runs Hugo as a child process, as with PYHUGO_SUPERVISE.
+STATS_ENV_VAR = "PYHUGO_STATS"
+
+# Wheels built with the extra_arch_levels Meson option ship hugo-<level>
+# binaries next to the baseline one, built for a higher GOAMD64 or GOARM64
+# level. The highest level that the CPU supports according to /proc/cpuinfo
+# is run instead of the baseline. Set PYHUGO_ARCH_LEVEL to a level to run
+# that binary, or to any other value (such as "baseline") to run the baseline.
+ARCH_LEVEL_ENV_VAR = "PYHUGO_ARCH_LEVEL"
+
+# For each machine, the levels from highest to lowest, with the /proc/cpuinfo
+# field that lists CPU features and the features each level requires. The
+# x86-64 levels follow the x86-64 psABI, which is what GOAMD64 implements.
+# scripts/native_launcher.sh.in has a copy of these for the native launcher.
+ARCH_LEVELS = {
+    "x86_64": (
+        "flags",
+        (
+            ("v4", {"avx512f", "avx512bw", "avx512cd", "avx512dq", "avx512vl"}),
+            (
+                "v3",
+                {"avx", "avx2", "bmi1", "bmi2", "f16c", "fma", "abm", "movbe", "xsave"},
+            ),
+            ("v2", {"cx16", "lahf_lm", "popcnt", "sse4_1", "sse4_2", "ssse3"}),
+        ),
+    ),
+    "aarch64": ("Features", (("v8.1", {"atomics", "crc32", "asimdrdm"}),)),
+}
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "") not in ("", "0")
+
+
+def _planned_binary(install_plan: Path) -> Path | None:
+    """Return the Hugo binary that Meson's install plan installs, if any."""
+    import json
+    from pathlib import Path, PurePosixPath
+
+    try:
+        with install_plan.open(encoding="utf-8") as file:
+            plan = json.load(file)
+    except OSError:
+        return None
+
+    for targets in plan.values():
+        for source, target in targets.items():
+            destination = PurePosixPath(target["destination"].replace("\\", "/"))
+            if destination.parts[-3:] == ("hugo", "binaries", HUGO_EXECUTABLE):
+                return Path(source)
+    return None
+
+
+def _editable_hugo_executable(rebuild: bool = False) -> Path | None:
+    """Resolve the bundled binary from meson-python's editable install tree.
+
+    Importing hugo already made meson-python rebuild the project, and it
+    caches that, so finder._rebuild() is free here. With ``rebuild``, the
+    binary is deleted and the cache cleared first, so that ninja reruns
+    build_hugo.py, which rebuilds Hugo if hugo-src changed.
+    """
+    from pathlib import Path
 
-def _editable_hugo_executable() -> Path | None:
-    """Resolve the bundled binary from meson-python's editable install tree."""
     for finder in sys.meta_path:
         if type(finder).__name__ != "MesonpyMetaFinder":
             continue
         if getattr(finder, "_name", None) != "hugo":
             continue
 
-        finder._rebuild()
-
         install_plan = Path(finder._build_path, "meson-info", "intro-install_plan.json")
-        if not install_plan.is_file():
-            continue
+        if rebuild:
+            binary = _planned_binary(install_plan)
+            if binary is not None:
+                binary.unlink(missing_ok=True)
+            finder._rebuild.cache_clear()
 
-        with install_plan.open(encoding="utf-8") as file:
-            plan = json.load(file)
+        finder._rebuild()
 
-        for targets in plan.values():
-            for source, target in targets.items():
-                destination = PurePosixPath(target["destination"].replace("\\", "/"))
-                if destination.parts[-3:] == ("hugo", "binaries", HUGO_EXECUTABLE):
-                    return Path(source)
+        binary = _planned_binary(install_plan)
+        if binary is not None:
+            return binary
 
     return None
 
 
-def _hugo_executable():
-    binary = Path(__file__).parent / HUGO_BINARY_PATH
+def _cpu_features(field: str) -> set[str]:
+    """Return the features /proc/cpuinfo lists for the first CPU."""
+    try:
+        with open("/proc/cpuinfo", encoding="ascii", errors="replace") as file:  # noqa: PTH123
+            for line in file:
+                name, _, value = line.partition(":")
+                if name.strip() == field:
+                    return set(value.split())
+    except OSError:
+        pass
+    return set()
+
+
+def _select_arch_level(binary: str) -> str:
+    """Return the hugo-<level> binary next to `binary` that suits this CPU best.
+
+    Falls back to `binary` when there are no such binaries, when the CPU
+    supports none of their levels, or on platforms without /proc/cpuinfo.
+    """
+    if not sysplatform.startswith("linux"):
+        return binary
+    machine = ARCH_LEVELS.get(os.uname().machine)
+    if machine is None:
+        return binary
+    field, levels = machine
+
+    directory, name = os.path.split(binary)
+    try:
+        available = {
+            entry[len(name) + 1 :]
+            for entry in os.listdir(directory or ".")  # noqa: PTH208
+            if entry.startswith(f"{name}-")
+        }
+    except OSError:
+        return binary
+    available.intersection_update(level for level, _ in levels)
+    if not available:
+        return binary
+
+    forced = os.environ.get(ARCH_LEVEL_ENV_VAR)
+    if forced is not None:
+        if forced in available:
+            return os.path.join(directory, f"{name}-{forced}")  # noqa: PTH118
+        return binary
+
+    features = _cpu_features(field)
+    for level, required in levels:
+        if level in available and required <= features:
+            return os.path.join(directory, f"{name}-{level}")  # noqa: PTH118
+    return binary
+
+
+def _hugo_executable(rebuild: bool | None = None) -> nullcontext[Path]:
+    from contextlib import nullcontext
+    from pathlib import Path
+
+    binary = Path(__file__).parent / "binaries" / HUGO_EXECUTABLE
     if binary.is_file():
-        return nullcontext(binary)
+        return nullcontext(Path(_select_arch_level(os.fspath(binary))))
 
-    editable_binary = _editable_hugo_executable()
+    if rebuild is None:
+        rebuild = _env_flag(REBUILD_ENV_VAR)
+    editable_binary = _editable_hugo_executable(rebuild=rebuild)
     if editable_binary is not None:
-        return nullcontext(editable_binary)
+        return nullcontext(Path(_select_arch_level(os.fspath(editable_binary))))
 
     raise FileNotFoundError(binary)
 
 
+def _print_banner(hugo_executable: str) -> None:
+    """Tell interactive users which Hugo runs, on stderr so stdout stays clean."""
+    if _env_flag(BANNER_ENV_VAR):
+        return
+    if sys.stderr is None or not sys.stderr.isatty():
+        return
+
+    from hugo._version import HUGO_VERSION
+
+    print(
+        f"\033[95mRunning Hugo {HUGO_VERSION} via hugo-python-distributions at {hugo_executable}\033[0m",
+        file=sys.stderr,
+    )
+
+
+def _in_terminal_foreground() -> bool:
+    """Return True if this process group receives the terminal's Ctrl+C."""
+    try:
+        return os.tcgetpgrp(sys.stdin.fileno()) == os.getpgrp()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def _wait(process: subprocess.Popen[bytes], rusage: bool) -> tuple[int, object | None]:
+    """Wait for Hugo and return its return code and, if asked, its resource usage.
+
+    The resource usage comes from os.wait4(), so it is None on Windows.
+    """
+    if not rusage or not hasattr(os, "wait4"):
+        return process.wait(), None
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # A signal handler polled the process and reaped it first.
+        return process.wait(), None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, usage
+
+
+def _run_supervised(argv: list[str], record: bool = False) -> int:
+    """Run Hugo as a child process and return an exit code for this process.
+
+    Hugo inherits stdin, stdout and stderr, so nothing is buffered. SIGTERM,
+    SIGHUP and SIGQUIT sent to this process are forwarded to Hugo. SIGINT is
+    forwarded too, except when it came from the terminal, which already sends
+    it to Hugo as part of the same foreground process group. On Windows, the
+    console delivers Ctrl+C and Ctrl+Break to Hugo directly, so they are only
+    kept from interrupting Python here.
+
+    If ``record`` is true, the run's resource usage is appended to the stats
+    file (see hugo.stats) once Hugo exits.
+    """
+    import signal
+    import subprocess
+    import time
+    from contextlib import suppress
+
+    start = time.perf_counter()
+    process = subprocess.Popen(argv)
+
+    def forward(signum: int, _frame: object) -> None:
+        if process.poll() is not None:
+            return
+        if sysplatform == "win32":
+            if signum == signal.SIGTERM:
+                process.terminate()
+            return
+        if signum == signal.SIGINT and _in_terminal_foreground():
+            return
+        process.send_signal(signum)
+
+    forwarded = ("SIGINT", "SIGTERM", "SIGHUP", "SIGQUIT", "SIGBREAK")
+    for name in forwarded:
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), forward)
+
+    returncode, rusage = _wait(process, rusage=record)
+    if record:
+        from hugo.stats import record as record_run
+
+        record_run(argv[1:], returncode, time.perf_counter() - start, rusage)
+    if returncode >= 0:
+        return returncode
+
+    # Hugo was killed by a signal. Die from the same signal, so that whatever
+    # supervises this process sees the same status as it would for Hugo.
+    # SIGKILL and SIGSTOP cannot be caught, so their handlers cannot be reset.
+    signum = -returncode
+    with suppress(OSError, ValueError):
+        signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
+    return 128 + signum
+
+
 def __call():
     """
     Hugo binary entry point. Passes all command-line arguments to Hugo.
     """
-    with _hugo_executable() as hugo_executable:
-        hugo_executable_str = os.fspath(hugo_executable)
-
-        print(
-            f"\033[95mRunning Hugo {HUGO_VERSION} via hugo-python-distributions at {hugo_executable_str}\033[0m"
-        )
+    # Plain string operations keep the installed-wheel path cheap, since
+    # this runs before every Hugo invocation.
+    hugo_executable_str = os.path.join(  # noqa: PTH118
+        os.path.dirname(__file__),  # noqa: PTH120
+        "binaries",
+        HUGO_EXECUTABLE,
+    )
+    if os.path.isfile(hugo_executable_str):  # noqa: PTH113
+        hugo_executable_str = _select_arch_level(hugo_executable_str)
+    else:
+        with _hugo_executable() as hugo_executable:
+            hugo_executable_str = os.fspath(hugo_executable)
 
-        from sys import argv as sysargv
+    _print_banner(hugo_executable_str)
 
-        if sysplatform == "win32":
-            from subprocess import check_call
+    from sys import argv as sysargv
 
-            check_call([hugo_executable_str, *sysargv[1:]])
-        else:
-            os.execv(hugo_executable_str, ["hugo", *sysargv[1:]])
+    record = _env_flag(STATS_ENV_VAR)
+    if sysplatform == "win32" or record or _env_flag(SUPERVISE_ENV_VAR):
+        sys.exit(_run_supervised([hugo_executable_str, *sysargv[1:]], record=record))
+    else:
+        os.execv(hugo_executable_str, ["hugo", *sysargv[1:]])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,250 @@
+"""
+Copyright (c) 2023 Agriya Khetarpal. All rights reserved.
+
+hugo: Binaries for the Hugo static site generator, installable with pip
+
+Supervises long-running `hugo server` processes: starts them on a free
+port, detects readiness from Hugo's own output, restarts them if they
+crash, and keeps a pool of warm servers keyed by site source directory.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import socket
+import subprocess
+import threading
+from collections import deque
+from collections.abc import Mapping
+from pathlib import Path
+from typing import TextIO
+
+from hugo.api import _merged_env, executable
+
+# Printed by `hugo server` once the site is built and the server listens.
+# Hugo picks another port by itself if the requested one is taken, so the
+# URL is read from this line rather than derived from --port.
+READY_PATTERN = re.compile(r"Web Server is available at (?P<url>\S+)")
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    """Return a TCP port on `host` that is free at the time of the call."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class HugoServer:
+    """A supervised `hugo server` process for one site.
+
+    Hugo's combined stdout and stderr are read on a background thread,
+    kept in a short backlog for error messages, and optionally echoed to
+    `output`. If Hugo exits without `stop()` being called, it is started
+    again on the same port, up to `max_restarts` times.
+    """
+
+    def __init__(
+        self,
+        source: str | os.PathLike[str],
+        *args: str | os.PathLike[str],
+        bind: str = "127.0.0.1",
+        port: int | None = None,
+        env: Mapping[str, str] | None = None,
+        hugo: str | os.PathLike[str] | None = None,
+        max_restarts: int = 3,
+        output: TextIO | None = None,
+    ) -> None:
+        self.source = Path(source).resolve()
+        self.args = [os.fspath(arg) for arg in args]
+        self.bind = bind
+        self.port = port
+        self.env = dict(env) if env is not None else None
+        self.hugo = hugo
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.output = output
+
+        self._cond = threading.Condition()
+        self._log: deque[str] = deque(maxlen=50)
+        self._process: subprocess.Popen[str] | None = None
+        self._thread: threading.Thread | None = None
+        self._url: str | None = None
+        self._failed = False
+        self._stopping = False
+
+    @property
+    def url(self) -> str | None:
+        """The URL Hugo serves the site at, or None until it is ready."""
+        return self._url
+
+    @property
+    def running(self) -> bool:
+        process = self._process
+        return process is not None and process.poll() is None
+
+    @property
+    def failed(self) -> bool:
+        """True once Hugo has exited and will not be restarted."""
+        return self._failed
+
+    def start(self, timeout: float | None = 60.0) -> str:
+        """Start Hugo if it is not running yet and return the URL once ready."""
+        with self._cond:
+            if self._process is None or self._failed:
+                if self.hugo is None:
+                    self.hugo = executable()
+                if self.port is None:
+                    self.port = free_port(self.bind)
+                self._stopping = False
+                self._failed = False
+                self.restarts = 0
+                self._spawn()
+        try:
+            return self.wait_ready(timeout)
+        except TimeoutError:
+            self.stop()
+            raise
+
+    def wait_ready(self, timeout: float | None = None) -> str:
+        """Block until Hugo reports that it is serving, and return the URL."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._url is not None or self._failed, timeout)
+            if self._url is not None:
+                return self._url
+            if self._failed:
+                msg = (
+                    f"hugo server for {self.source} exited with code "
+                    f"{self._process.returncode if self._process else None}:\n"
+                    + "".join(self._log)
+                )
+                raise RuntimeError(msg)
+        msg = f"hugo server for {self.source} was not ready within {timeout} seconds"
+        raise TimeoutError(msg)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Terminate Hugo, killing it if it does not exit within `timeout`."""
+        with self._cond:
+            self._stopping = True
+            process, thread = self._process, self._thread
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        with self._cond:
+            self._process = None
+            self._thread = None
+            self._url = None
+            self._cond.notify_all()
+
+    def _spawn(self) -> None:
+        """Start a Hugo process. Must be called with `_cond` held."""
+        self._url = None
+        process = subprocess.Popen(
+            [
+                os.fspath(self.hugo),
+                "server",
+                "--source",
+                os.fspath(self.source),
+                "--bind",
+                self.bind,
+                "--port",
+                str(self.port),
+                *self.args,
+            ],
+            env=_merged_env(self.env),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+        self._process = process
+        self._thread = threading.Thread(
+            target=self._watch,
+            args=(process,),
+            name=f"hugo-server-{self.port}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _watch(self, process: subprocess.Popen[str]) -> None:
+        for line in process.stdout:
+            self._log.append(line)
+            if self.output is not None:
+                self.output.write(line)
+                self.output.flush()
+            if self._url is None and (match := READY_PATTERN.search(line)):
+                with self._cond:
+                    if process is self._process:
+                        self._url = match["url"]
+                        self._cond.notify_all()
+        process.wait()
+
+        with self._cond:
+            if self._stopping or process is not self._process:
+                return
+            if self.restarts < self.max_restarts:
+                self.restarts += 1
+                self._spawn()
+                return
+            self._url = None
+            self._failed = True
+            self._cond.notify_all()
+
+    def __enter__(self) -> HugoServer:
+        self.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+class ServerPool:
+    """Keeps one warm `HugoServer` per source directory and set of arguments.
+
+    Keyword arguments are passed on to every `HugoServer` the pool creates.
+    """
+
+    def __init__(self, **server_options: object) -> None:
+        self._server_options = server_options
+        self._servers: dict[tuple[Path, tuple[str, ...]], HugoServer] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        source: str | os.PathLike[str],
+        *args: str | os.PathLike[str],
+        timeout: float | None = 60.0,
+    ) -> HugoServer:
+        """Return a ready server for `source`, starting one if needed."""
+        key = (Path(source).resolve(), tuple(os.fspath(arg) for arg in args))
+        with self._lock:
+            server = self._servers.get(key)
+            if server is None or server.failed or not server.running:
+                if server is not None:
+                    server.stop()
+                server = HugoServer(key[0], *key[1], **self._server_options)
+                self._servers[key] = server
+        server.start(timeout)
+        return server
+
+    def close(self) -> None:
+        """Stop every server in the pool."""
+        with self._lock:
+            servers = list(self._servers.values())
+            self._servers.clear()
+        for server in servers:
+            server.stop()
+
+    def __enter__(self) -> ServerPool:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,287 @@
+"""
+Copyright (c) 2023 Agriya Khetarpal. All rights reserved.
+
+hugo: Binaries for the Hugo static site generator, installable with pip
+
+Opt-in resource usage records of `hugo` invocations. With PYHUGO_STATS=1,
+the `hugo` command runs Hugo as a child process and appends a JSON line per
+run to a log file, with the subcommand, source directory, exit code, wall
+time, CPU time and peak resident set size. `python -m hugo.stats` prints a
+summary of the log.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from hugo.cli import STATS_ENV_VAR
+
+# Set PYHUGO_STATS_FILE to write the records somewhere other than the
+# default, see stats_file().
+STATS_FILE_ENV_VAR = "PYHUGO_STATS_FILE"
+
+# Once the log reaches this size, it is renamed to <name>.1, replacing the
+# previous one, and a new log is started.
+MAX_LOG_BYTES = 10 * 2**20
+
+# Hugo's subcommands, and the global flags that take a separate value, which
+# must be skipped to find the subcommand in `hugo --source site server`.
+SUBCOMMANDS = {
+    "build",
+    "completion",
+    "config",
+    "convert",
+    "deploy",
+    "env",
+    "gen",
+    "help",
+    "import",
+    "list",
+    "mod",
+    "new",
+    "server",
+    "serve",
+    "version",
+}
+VALUE_FLAGS = {
+    "-b",
+    "--baseURL",
+    "--cacheDir",
+    "--clock",
+    "--config",
+    "--configDir",
+    "-c",
+    "--contentDir",
+    "-d",
+    "--destination",
+    "-e",
+    "--environment",
+    "--ignoreVendorPaths",
+    "--layoutDir",
+    "--logLevel",
+    "-s",
+    "--source",
+    "-t",
+    "--theme",
+    "--themesDir",
+}
+
+
+def stats_file() -> Path:
+    """Return the file that invocations are recorded in."""
+    path = os.environ.get(STATS_FILE_ENV_VAR)
+    if path:
+        return Path(path).expanduser()
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    else:
+        base = Path(
+            os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state"
+        )
+    return base / "hugo-python-distributions" / "stats.jsonl"
+
+
+def parse_invocation(args: list[str]) -> tuple[str, str]:
+    """Return the subcommand and the absolute source directory of Hugo's args."""
+    subcommand = None
+    source = "."
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        name, has_value, value = arg.partition("=")
+        if name in ("-s", "--source"):
+            if has_value:
+                source = value
+            elif i + 1 < len(args):
+                source = args[i + 1]
+        if arg.startswith("-"):
+            if name in VALUE_FLAGS and not has_value:
+                i += 1
+        elif subcommand is None:
+            subcommand = arg
+        i += 1
+    if subcommand is None:
+        subcommand = "build"
+    elif subcommand not in SUBCOMMANDS:
+        subcommand = "other"
+    return subcommand, os.path.abspath(source)  # noqa: PTH100
+
+
+def record(
+    args: list[str],
+    returncode: int,
+    wall_seconds: float,
+    rusage: Any | None,
+) -> None:
+    """Append a record of a Hugo run to the stats file.
+
+    `rusage` is the resource usage from os.wait4(), or None where that is
+    not available (on Windows). Failures are ignored, since recording must
+    never get in the way of running Hugo.
+    """
+    subcommand, source = parse_invocation(args)
+    entry: dict[str, Any] = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "subcommand": subcommand,
+        "source": source,
+        "exit_code": returncode,
+        "wall_seconds": round(wall_seconds, 3),
+        "user_seconds": None,
+        "system_seconds": None,
+        "max_rss": None,
+    }
+    if rusage is not None:
+        entry["user_seconds"] = round(rusage.ru_utime, 3)
+        entry["system_seconds"] = round(rusage.ru_stime, 3)
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+        scale = 1 if sys.platform == "darwin" else 1024
+        entry["max_rss"] = rusage.ru_maxrss * scale
+
+    path = stats_file()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if path.stat().st_size >= MAX_LOG_BYTES:
+                path.replace(path.with_name(path.name + ".1"))
+        except FileNotFoundError:
+            pass
+        # A single short write in append mode, so that concurrent runs do not
+        # interleave their lines.
+        with path.open("a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+
+
+def load(path: Path) -> list[dict[str, Any]]:
+    """Return the records in `path` and in its rotated predecessor, oldest first."""
+    entries = []
+    for log in (path.with_name(path.name + ".1"), path):
+        try:
+            lines = log.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            continue
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A line cut short by a full disk or a crash.
+                continue
+    return entries
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the `q`-th percentile of `values` by the nearest-rank method."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(entries: list[dict[str, Any]], by: list[str]) -> list[dict[str, Any]]:
+    """Group the records by the `by` fields and compute their percentiles."""
+    groups: dict[tuple[str, ...], list[dict[str, Any]]] = defaultdict(list)
+    for entry in entries:
+        groups[tuple(str(entry.get(field)) for field in by)].append(entry)
+
+    rows = []
+    for key, runs in sorted(groups.items()):
+        row: dict[str, Any] = dict(zip(by, key, strict=True))
+        row["runs"] = len(runs)
+        row["failed"] = sum(1 for run in runs if run.get("exit_code") != 0)
+        for field in ("wall_seconds", "max_rss"):
+            values = [run[field] for run in runs if run.get(field) is not None]
+            for q in (50, 95):
+                row[f"{field}_p{q}"] = percentile(values, q) if values else None
+        cpu = [
+            round(run["user_seconds"] + run["system_seconds"], 3)
+            for run in runs
+            if run.get("user_seconds") is not None
+        ]
+        row["cpu_seconds_p50"] = percentile(cpu, 50) if cpu else None
+        rows.append(row)
+    return rows
+
+
+def _format(value: float | None, scale: float = 1, digits: int = 2) -> str:
+    return "-" if value is None else f"{value / scale:.{digits}f}"
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    p = argparse.ArgumentParser(
+        prog="python -m hugo.stats",
+        description="Summarize the runs of the hugo command recorded with PYHUGO_STATS=1.",
+    )
+    p.add_argument(
+        "file",
+        nargs="?",
+        type=Path,
+        default=None,
+        help=f"stats file (default: {stats_file()})",
+    )
+    p.add_argument(
+        "--by",
+        choices=("subcommand", "source", "both"),
+        default="both",
+        help="how to group the runs (default: both)",
+    )
+    p.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = p.parse_args(argv)
+
+    path = args.file or stats_file()
+    entries = load(path)
+    if not entries:
+        print(f"No runs recorded in {path}. Set {STATS_ENV_VAR}=1 to record them.")
+        return 1
+
+    by = ["subcommand", "source"] if args.by == "both" else [args.by]
+    rows = summarize(entries, by)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    headers = [
+        *by,
+        "runs",
+        "failed",
+        "wall p50 (s)",
+        "wall p95 (s)",
+        "cpu p50 (s)",
+        "rss p50 (MB)",
+        "rss p95 (MB)",
+    ]
+    table = [
+        [
+            *(row[field] for field in by),
+            str(row["runs"]),
+            str(row["failed"]),
+            _format(row["wall_seconds_p50"]),
+            _format(row["wall_seconds_p95"]),
+            _format(row["cpu_seconds_p50"]),
+            _format(row["max_rss_p50"], 2**20, 0),
+            _format(row["max_rss_p95"], 2**20, 0),
+        ]
+        for row in rows
+    ]
+    widths = [
+        max(len(cell) for cell in column)
+        for column in zip(headers, *table, strict=True)
+    ]
+    for cells in [headers, *table]:
+        line = "  ".join(
+            cell.ljust(width) for cell, width in zip(cells, widths, strict=True)
+        )
+        print(line.rstrip())
+    print(f"\n{len(entries)} runs from {entries[0]['time']} to {entries[-1]['time']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())